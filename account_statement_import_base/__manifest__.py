@@ -5,7 +5,7 @@
 {
     "name": "Base module for Bank Statement Import",
     "category": "Accounting",
-    "version": "16.0.1.0.0",
+    "version": "16.0.1.2.0",
     "license": "LGPL-3",
     "depends": ["account_statement_base"],
     "author": "Akretion, Odoo Community Association (OCA)",
@@ -13,6 +13,7 @@
     "development_status": "Mature",
     "website": "https://github.com/OCA/bank-statement-import",
     "data": [
+        "data/ir_cron.xml",
         "views/account_bank_statement_line.xml",
     ],
     "installable": True,
@@ -0,0 +1,40 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
+
+import zlib
+
+from openupgradelib import openupgrade
+
+from odoo.tools import split_every
+
+
+@openupgrade.migrate()
+def migrate(env, version):
+    # raw_data is not stored any more: compress it in raw_data_compressed
+    if not openupgrade.column_exists(env.cr, "account_bank_statement_line", "raw_data"):
+        return
+    env.cr.execute(
+        "SELECT id FROM account_bank_statement_line WHERE raw_data IS NOT NULL"
+    )
+    line_ids = [row[0] for row in env.cr.fetchall()]
+    for ids in split_every(1000, line_ids):
+        env.cr.execute(
+            "SELECT id, raw_data FROM account_bank_statement_line WHERE id IN %s",
+            (ids,),
+        )
+        rows = env.cr.fetchall()
+        params = []
+        for line_id, raw_data in rows:
+            params += [line_id, zlib.compress(raw_data.encode("utf-8"))]
+        env.cr.execute(
+            """
+            UPDATE account_bank_statement_line line
+            SET raw_data_compressed = data.raw_data_compressed
+            FROM (VALUES %s) AS data(id, raw_data_compressed)
+            WHERE line.id = data.id
+            """
+            % ", ".join(["(%s, %s::bytea)"] * len(rows)),
+            params,
+        )
+    openupgrade.logged_query(
+        env.cr, "ALTER TABLE account_bank_statement_line DROP COLUMN raw_data"
+    )
@@ -0,0 +1,38 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
+
+from openupgradelib import openupgrade
+
+BATCH_SIZE = 100000
+
+
+@openupgrade.migrate()
+def migrate(env, version):
+    # Backfill unique_import_hash before the ORM creates the column, so that
+    # it is not recomputed line by line. md5() gives the same digest as
+    # _get_unique_import_hash().
+    if openupgrade.column_exists(
+        env.cr, "account_bank_statement_line", "unique_import_hash"
+    ):
+        return
+    openupgrade.logged_query(
+        env.cr,
+        """
+        ALTER TABLE account_bank_statement_line
+        ADD COLUMN unique_import_hash VARCHAR
+        """,
+    )
+    env.cr.execute("SELECT min(id), max(id) FROM account_bank_statement_line")
+    min_id, max_id = env.cr.fetchone()
+    if min_id is None:
+        return
+    for start_id in range(min_id, max_id + 1, BATCH_SIZE):
+        openupgrade.logged_query(
+            env.cr,
+            """
+            UPDATE account_bank_statement_line
+            SET unique_import_hash = md5(unique_import_id)
+            WHERE id >= %s AND id < %s
+            AND unique_import_id IS NOT NULL
+            """,
+            (start_id, start_id + BATCH_SIZE),
+        )
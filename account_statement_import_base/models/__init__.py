@@ -1,2 +1,3 @@
 from . import account_bank_statement_line
 from . import account_journal
+from . import res_partner_bank
@@ -2,21 +2,167 @@
 # @author: Alexis de Lattre <alexis.delattre@akretion.com>
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
 
-from odoo import fields, models
+import hashlib
+import logging
+import zlib
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+from odoo.tools import split_every
+
+logger = logging.getLogger(__name__)
 
 
 class AccountBankStatementLine(models.Model):
     _inherit = "account.bank.statement.line"
 
     # Ensure transactions can be imported only once
-    # if the import format provides unique transaction IDs
-    unique_import_id = fields.Char(string="Import ID", readonly=True, copy=False)
-    raw_data = fields.Text(readonly=True, copy=False)
+    # if the import format provides unique transaction IDs.
+    # The index is kept for the modules searching the lines by unique_import_id.
+    unique_import_id = fields.Char(
+        string="Import ID", readonly=True, copy=False, index=True
+    )
+    # Fixed-width key of unique_import_id, used for the unicity constraint
+    # and the lookups of already imported transactions: its index is much
+    # smaller than an index on the long unique_import_id
+    unique_import_hash = fields.Char(
+        compute="_compute_unique_import_hash", store=True, copy=False
+    )
+    # raw_data is stored compressed with zlib in raw_data_compressed: the raw
+    # transactions of the online providers (JSON, dict repr...) compress very
+    # well. The binary field holds the zlib bytes as they are, not encoded in
+    # base64 (33% bigger): it is only read and written through raw_data.
+    raw_data = fields.Text(
+        compute="_compute_raw_data",
+        inverse="_inverse_raw_data",
+        search="_search_raw_data",
+        readonly=True,
+    )
+    raw_data_compressed = fields.Binary(
+        attachment=False, readonly=True, copy=False, prefetch=False, exportable=False
+    )
 
     _sql_constraints = [
         (
             "unique_import_id",
-            "unique(unique_import_id)",
+            "unique(unique_import_hash)",
             "A bank account transaction can be imported only once!",
         )
     ]
+
+    @api.model
+    def _get_unique_import_hash(self, unique_import_id):
+        """Return the hexadecimal MD5 digest (16 bytes) of unique_import_id.
+        MD5 is not used for security here, and it is also available in SQL
+        with md5(), which makes migrations easy."""
+        return hashlib.md5(unique_import_id.encode("utf-8")).hexdigest()
+
+    @api.depends("unique_import_id")
+    def _compute_unique_import_hash(self):
+        for line in self:
+            line.unique_import_hash = (
+                line.unique_import_id
+                and self._get_unique_import_hash(line.unique_import_id)
+                or False
+            )
+
+    @api.model
+    def _get_imported_unique_import_ids(self, unique_import_ids):
+        """Return a dict {unique_import_id: statement line ID} for the
+        unique_import_ids that have already been imported.
+        The lookup is done on unique_import_hash, with a few IN queries
+        instead of one query per transaction."""
+        hash2import_id = {
+            self._get_unique_import_hash(unique_import_id): unique_import_id
+            for unique_import_id in unique_import_ids
+        }
+        existing_lines = {}
+        for hashes_chunk in split_every(self.env.cr.IN_MAX, hash2import_id, list):
+            lines = self.sudo().search_read(
+                [("unique_import_hash", "in", hashes_chunk)], ["unique_import_hash"]
+            )
+            for line in lines:
+                existing_lines[hash2import_id[line["unique_import_hash"]]] = line["id"]
+        return existing_lines
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        # Compress raw_data in the creation values: the inverse of raw_data
+        # would write each line again after its creation
+        vals_list = [
+            self._convert_raw_data_vals(vals) if "raw_data" in vals else vals
+            for vals in vals_list
+        ]
+        return super().create(vals_list)
+
+    @api.model
+    def _convert_raw_data_vals(self, vals):
+        vals = dict(vals)
+        vals["raw_data_compressed"] = self._compress_raw_data(vals.pop("raw_data"))
+        return vals
+
+    @api.model
+    def _compress_raw_data(self, raw_data):
+        if not raw_data:
+            return False
+        return zlib.compress(raw_data.encode("utf-8"))
+
+    @api.model
+    def _decompress_raw_data(self, raw_data_compressed):
+        if not raw_data_compressed:
+            return False
+        return zlib.decompress(raw_data_compressed).decode("utf-8")
+
+    @api.depends("raw_data_compressed")
+    def _compute_raw_data(self):
+        # With bin_size in the context (web client), binary fields
+        # are read as their human readable size
+        for line in self.with_context(bin_size=False):
+            line.raw_data = self._decompress_raw_data(line.raw_data_compressed)
+
+    def _inverse_raw_data(self):
+        for line in self:
+            line.raw_data_compressed = self._compress_raw_data(line.raw_data)
+
+    def _search_raw_data(self, operator, value):
+        # The compressed data can only be searched for being set or not
+        if operator not in ("=", "!=") or value:
+            raise UserError(_("The raw data can only be searched as set or not set."))
+        return [("raw_data_compressed", operator, value)]
+
+    @api.model
+    def _gc_raw_data(self):
+        """Clear the raw data of the statement lines older than the number of
+        months of the system parameter
+        'account_statement_import_base.raw_data_retention_months' (0 or not set:
+        the raw data is kept forever)."""
+        retention_months = int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("account_statement_import_base.raw_data_retention_months", 0)
+        )
+        if retention_months <= 0:
+            return
+        # Direct SQL query: going through write() would synchronize
+        # each line with its journal entry
+        self.env["account.move"].flush_model(["date"])
+        self.flush_model(["raw_data_compressed"])
+        self.env.cr.execute(
+            """
+            UPDATE account_bank_statement_line line
+            SET raw_data_compressed = NULL
+            FROM account_move move
+            WHERE move.id = line.move_id
+            AND move.date < %s
+            AND line.raw_data_compressed IS NOT NULL
+            """,
+            (fields.Date.today() - relativedelta(months=retention_months),),
+        )
+        logger.info(
+            "Cleared the raw data of %d bank statement lines older than %d months",
+            self.env.cr.rowcount,
+            retention_months,
+        )
+        self.invalidate_model(["raw_data_compressed", "raw_data"])
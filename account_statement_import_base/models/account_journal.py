@@ -3,6 +3,7 @@
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
 
 from odoo import api, models
+from odoo.tools import split_every
 
 from odoo.addons.base.models.res_bank import sanitize_account_number
 
@@ -16,20 +17,79 @@ class AccountJournal(models.Model):
         that will later be used for many statement lines (to avoid
         searching data for each statement line).
         The goal is to improve performances.
+        The context key 'statement_line_import_account_numbers' can give
+        the sanitized account numbers of the statement lines: only the
+        partner bank accounts with these numbers are then put in the
+        speeddict.
+        The context key 'statement_line_import_speeddict_maps' can ask for
+        additional maps, as a dict {map name: names or references of the
+        statement lines}. Only the partners with these exact names or
+        references are put in the maps:
+        - 'partner_name': {normalized partner name: partner ID}
+          (see _statement_line_import_normalize_partner_name())
+        - 'partner_ref': {partner reference: partner ID}
         """
         self.ensure_one()
         speeddict = {"account_number": {}}
-        partner_banks = self.env["res.partner.bank"].search_read(
-            [("company_id", "in", (False, self.company_id.id))],
-            ["acc_number", "partner_id"],
-        )
-        for partner_bank in partner_banks:
-            speeddict["account_number"][partner_bank["acc_number"]] = {
-                "partner_id": partner_bank["partner_id"][0],
-                "partner_bank_id": partner_bank["id"],
+        account_numbers = self.env.context.get("statement_line_import_account_numbers")
+        account_number_map = self.env[
+            "res.partner.bank"
+        ]._statement_line_import_account_number_map(self.company_id.id, account_numbers)
+        for account_number, (partner_id, partner_bank_id) in account_number_map.items():
+            speeddict["account_number"][account_number] = {
+                "partner_id": partner_id,
+                "partner_bank_id": partner_bank_id,
             }
+        speeddict_maps = self.env.context.get("statement_line_import_speeddict_maps")
+        if speeddict_maps:
+            speeddict.update(self._statement_line_import_partner_maps(speeddict_maps))
         return speeddict
 
+    def _statement_line_import_partner_maps(self, speeddict_maps):
+        """Return the partner maps of the speeddict. When several partners
+        have the same name or reference, the first one in the default
+        order of partners is used, as a search() with limit=1 would do."""
+        partner_obj = self.env["res.partner"]
+        maps = {}
+        if "partner_name" in speeddict_maps:
+            maps["partner_name"] = {}
+            for names in split_every(
+                self.env.cr.IN_MAX, sorted(speeddict_maps["partner_name"]), list
+            ):
+                for partner in partner_obj.search_read(
+                    [("name", "in", names)], ["name"]
+                ):
+                    maps["partner_name"].setdefault(
+                        self._statement_line_import_normalize_partner_name(
+                            partner["name"]
+                        ),
+                        partner["id"],
+                    )
+        if "partner_ref" in speeddict_maps:
+            maps["partner_ref"] = {}
+            for refs in split_every(
+                self.env.cr.IN_MAX, sorted(speeddict_maps["partner_ref"]), list
+            ):
+                for partner in partner_obj.search_read([("ref", "in", refs)], ["ref"]):
+                    maps["partner_ref"].setdefault(partner["ref"], partner["id"])
+        return maps
+
+    @api.model
+    def _statement_line_import_normalize_partner_name(self, name):
+        """Key of the 'partner_name' map of the speeddict"""
+        return " ".join(name.split()).casefold()
+
+    def _statement_line_import_account_numbers(self, lines_vals):
+        """Return the sanitized account numbers of the given statement
+        lines, to be given to _statement_line_import_speeddict()"""
+        account_numbers = {
+            vals["account_number"] for vals in lines_vals if vals.get("account_number")
+        }
+        return {
+            self._sanitize_bank_account_number(account_number)
+            for account_number in account_numbers
+        }
+
     def _statement_line_import_update_hook(self, st_line_vals, speeddict):
         """This method is designed to be inherited by reconciliation modules.
         In this method you can:
@@ -50,6 +110,17 @@ class AccountJournal(models.Model):
                     speeddict["account_number"][st_line_vals["account_number"]]
                 )
 
+    def _statement_lines_import_update_batch_hook(self, lines_vals, speeddict):
+        """This method is designed to be inherited by reconciliation modules.
+        It is called with all the lines of a statement, after
+        _statement_line_import_update_hook() has been called on each of them,
+        so that the lines can be matched with a few set-based queries
+        instead of one search per line. As in the per-line hook, you can
+        update the values of the lines, for example 'partner_id' or
+        'counterpart_account_id'.
+        """
+        self.ensure_one()
+
     def _statement_line_import_update_unique_import_id(
         self, st_line_vals, account_number
     ):
@@ -63,6 +134,53 @@ class AccountJournal(models.Model):
                 + st_line_vals["unique_import_id"]
             )
 
+    def _statement_lines_import_update(self, lines_vals, account_number, speeddict):
+        """Complete the values of the lines of a statement in one pass: same
+        result as calling _statement_line_import_update_unique_import_id()
+        and _statement_line_import_update_hook() on each line, but each
+        distinct account number is sanitized only once. If a module
+        overrides one of these per-line methods, they are still called
+        on each line."""
+        self.ensure_one()
+        journal_class = type(self)
+        if (
+            journal_class._statement_line_import_update_unique_import_id
+            is not AccountJournal._statement_line_import_update_unique_import_id
+            or journal_class._statement_line_import_update_hook
+            is not AccountJournal._statement_line_import_update_hook
+        ):
+            for st_line_vals in lines_vals:
+                self._statement_line_import_update_unique_import_id(
+                    st_line_vals, account_number
+                )
+                self._statement_line_import_update_hook(st_line_vals, speeddict)
+            return
+        sanitized_acc_number = self._sanitize_bank_account_number(account_number)
+        unique_import_id_prefix = (
+            (sanitized_acc_number and sanitized_acc_number + "-" or "")
+            + str(self.id)
+            + "-"
+        )
+        sanitized_numbers = {}
+        account_number_dict = speeddict["account_number"]
+        for st_line_vals in lines_vals:
+            if st_line_vals.get("unique_import_id"):
+                st_line_vals["unique_import_id"] = (
+                    unique_import_id_prefix + st_line_vals["unique_import_id"]
+                )
+            line_account_number = st_line_vals.get("account_number")
+            if line_account_number:
+                if line_account_number not in sanitized_numbers:
+                    sanitized_numbers[
+                        line_account_number
+                    ] = self._sanitize_bank_account_number(line_account_number)
+                line_account_number = sanitized_numbers[line_account_number]
+                st_line_vals["account_number"] = line_account_number
+                if not st_line_vals.get("partner_id") and account_number_dict.get(
+                    line_account_number
+                ):
+                    st_line_vals.update(account_number_dict[line_account_number])
+
     @api.model
     def _sanitize_bank_account_number(self, account_number):
         """Hook for extension"""
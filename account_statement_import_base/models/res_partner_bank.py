@@ -0,0 +1,140 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
+
+from odoo import api, models
+from odoo.tools import split_every
+from odoo.tools.lru import LRU
+
+# Stamps of the partner bank accounts of each company (0 for the shared
+# accounts): a row of VERSION_TABLE is updated in the transaction which
+# creates, modifies or deletes a bank account, so that a reader gets the
+# stamp of its own snapshot. Its values are taken from VERSION_SEQUENCE,
+# so that the stamp of a rolled back transaction is never used again.
+VERSION_TABLE = "account_statement_import_partner_bank_version"
+VERSION_SEQUENCE = "account_statement_import_partner_bank_version_seq"
+# Maximum number of account numbers kept by the cache of each process
+ACCOUNT_NUMBER_CACHE_SIZE = 8192
+
+# {(database, company ID, stamp, sanitized account number): (partner ID,
+# partner bank account ID) or None}, shared by the imports and online
+# pulls of the process
+_account_number_cache = LRU(ACCOUNT_NUMBER_CACHE_SIZE)
+
+
+class ResPartnerBank(models.Model):
+    _inherit = "res.partner.bank"
+
+    def init(self):
+        res = super().init()
+        self.env.cr.execute(f"CREATE SEQUENCE IF NOT EXISTS {VERSION_SEQUENCE}")
+        self.env.cr.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+                company_id integer PRIMARY KEY,
+                version bigint NOT NULL
+            )
+            """
+        )
+        return res
+
+    @api.model
+    def _statement_line_import_version(self, company_id):
+        """Return the stamp of the bank accounts of the company and of the
+        shared ones, as seen by the snapshot of the transaction"""
+        self.env.cr.execute(
+            f"""
+            SELECT company_id, version FROM {VERSION_TABLE}
+            WHERE company_id IN %s ORDER BY company_id
+            """,
+            ((0, company_id),),
+        )
+        return tuple(self.env.cr.fetchall())
+
+    def _statement_line_import_bump_version(self):
+        """Give a new stamp to the companies of the bank accounts"""
+        company_ids = {partner_bank.company_id.id or 0 for partner_bank in self}
+        for company_id in sorted(company_ids):
+            self.env.cr.execute(
+                f"""
+                INSERT INTO {VERSION_TABLE} (company_id, version)
+                VALUES (%s, nextval(%s))
+                ON CONFLICT (company_id) DO UPDATE SET version = EXCLUDED.version
+                """,
+                (company_id, VERSION_SEQUENCE),
+            )
+
+    @api.model
+    def _statement_line_import_read_account_numbers(self, company_id, domain):
+        """Return a dict {sanitized account number: (partner ID, partner
+        bank account ID)} of the bank accounts of the company and of the
+        shared ones that match the domain"""
+        partner_banks = self.sudo().search_read(
+            [("company_id", "in", (False, company_id))] + domain,
+            ["sanitized_acc_number", "partner_id"],
+            order="id",
+        )
+        return {
+            partner_bank["sanitized_acc_number"]: (
+                partner_bank["partner_id"][0],
+                partner_bank["id"],
+            )
+            for partner_bank in partner_banks
+        }
+
+    @api.model
+    def _statement_line_import_account_number_map(
+        self, company_id, account_numbers=None
+    ):
+        """Same as _statement_line_import_read_account_numbers(), restricted
+        to the given sanitized account numbers (all the bank accounts if
+        None). The result of each number is cached by the process for the
+        stamp of the bank accounts, including the numbers which are not
+        found, in a cache of bounded size. Only the numbers that are not
+        cached are searched, with one indexed query."""
+        if account_numbers is None:
+            return self._statement_line_import_read_account_numbers(company_id, [])
+        if not account_numbers:
+            return {}
+        key = (
+            self.env.cr.dbname,
+            company_id,
+            self._statement_line_import_version(company_id),
+        )
+        cached = {}
+        for account_number in account_numbers:
+            try:
+                cached[account_number] = _account_number_cache[key + (account_number,)]
+            except KeyError:
+                continue
+        missing_numbers = sorted(set(account_numbers) - set(cached))
+        for numbers in split_every(self.env.cr.IN_MAX, missing_numbers, list):
+            found = self._statement_line_import_read_account_numbers(
+                company_id, [("sanitized_acc_number", "in", numbers)]
+            )
+            for account_number in numbers:
+                cached[account_number] = found.get(account_number)
+                _account_number_cache[key + (account_number,)] = cached[account_number]
+        return {
+            account_number: value for account_number, value in cached.items() if value
+        }
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super().create(vals_list)
+        res._statement_line_import_bump_version()
+        return res
+
+    def write(self, vals):
+        fields_changed = {"acc_number", "partner_id", "company_id", "active"} & set(
+            vals
+        )
+        if "company_id" in vals:
+            # The bank accounts leave their previous companies
+            self._statement_line_import_bump_version()
+        res = super().write(vals)
+        if fields_changed:
+            self._statement_line_import_bump_version()
+        return res
+
+    def unlink(self):
+        self._statement_line_import_bump_version()
+        return super().unlink()
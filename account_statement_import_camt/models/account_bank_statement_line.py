@@ -1,12 +1,35 @@
 # Copyright 2019 Camptocamp SA
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
-from odoo import models
+import json
+
+from odoo import api, fields, models
 
 
 class AccountBankStatementLine(models.Model):
 
     _inherit = "account.bank.statement.line"
 
+    # Narration values of the camt transaction, by key, in compact JSON,
+    # when the system parameter account_statement_import_camt.structured_narration
+    # is set: they are rendered in the language of the user when displayed
+    camt_narration_data = fields.Text(
+        string="CAMT Narration Data", readonly=True, copy=False
+    )
+    camt_narration = fields.Text(
+        string="CAMT Narration", compute="_compute_camt_narration"
+    )
+
+    @api.depends("camt_narration_data")
+    @api.depends_context("lang")
+    def _compute_camt_narration(self):
+        parser = self.env["account.statement.import.camt.parser"]
+        for line in self:
+            line.camt_narration = (
+                line.camt_narration_data
+                and parser.render_narration(json.loads(line.camt_narration_data))
+                or False
+            )
+
     def write(self, vals):
         """
         Purpose of this hook is catch updates for records with name == '/'
@@ -1,37 +1,105 @@
 # Copyright 2013-2016 Therp BV <https://therp.nl>
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
 import logging
+import re
 import zipfile
 from io import BytesIO
 
 from odoo import models
 
+from odoo.addons.account_statement_import_file.wizard.account_statement_import import (
+    STATEMENT_FILE_HEAD_SIZE,
+)
+
 _logger = logging.getLogger(__name__)
 
+# Same namespaces as the ones accepted by the parser (check_version)
+CAMT_NAMESPACE_RE = re.compile(
+    rb"xmlns(?::\w+)?\s*=\s*[\"'](urn:iso:std:iso:20022:tech:xsd:camt\.|ISO:camt\.)"
+)
+ZIP_MAGIC = b"PK\x03\x04"
+
 
 class AccountBankStatementImport(models.TransientModel):
     _inherit = "account.statement.import"
 
+    def _get_statement_file_formats(self):
+        return super()._get_statement_file_formats() + [
+            ("camt", self._detect_camt, self._parse_camt_stream),
+            ("camt_zip", self._detect_camt_zip, self._parse_camt_zip_file),
+        ]
+
+    def _detect_camt(self, head):
+        return bool(CAMT_NAMESPACE_RE.search(head))
+
+    def _detect_camt_zip(self, head):
+        # The name of the first member of the archive follows the header
+        # of the first local file, it allows to skip office documents
+        # (XLSX files for example), which are zip archives too.
+        return head.startswith(ZIP_MAGIC) and not head[30:60].startswith(
+            (b"[Content_Types].xml", b"_rels/", b"docProps/", b"xl/", b"mimetype")
+        )
+
+    def _parse_camt_file(self, data_file):
+        parser = self.env["account.statement.import.camt.parser"]
+        return parser.parse(data_file)
+
+    def _parse_camt_stream(self, data_file):
+        """Parse a camt file while its statements are imported, so that
+        big files are imported with a bounded memory usage"""
+        parser = self.env["account.statement.import.camt.parser"]
+        return parser.parse_stream(data_file)
+
+    def _parse_camt_zip_file(self, data_file):
+        """Parse the members of a zip archive. Each member gives its own
+        triplets (see _parse_file), which are returned in the order of the
+        archive."""
+        try:
+            with zipfile.ZipFile(BytesIO(data_file)) as archive:
+                results = [
+                    self._parse_camt_zip_member(archive, info.filename)
+                    for info in archive.infolist()
+                    if not info.is_dir()
+                ]
+        except zipfile.BadZipFile as e:
+            raise ValueError("Not a valid zip file.") from e
+        return [triplet for triplets in results for triplet in triplets]
+
+    def _parse_camt_zip_member(self, archive, name):
+        """Parse a member of a zip archive, and return the list of its
+        triplets (see _parse_file), with lists of statements. camt files
+        are parsed while they are decompressed."""
+        with archive.open(name) as member:
+            if self._detect_camt(member.read(STATEMENT_FILE_HEAD_SIZE)):
+                member.seek(0)
+                parser = self.env["account.statement.import.camt.parser"]
+                try:
+                    return [parser.parse(member)]
+                except ValueError:
+                    _logger.debug(
+                        "Member %s was detected as camt but could not be "
+                        "parsed as such",
+                        name,
+                        exc_info=True,
+                    )
+        parsing_data = self._parse_file(archive.read(name))
+        if isinstance(parsing_data, tuple):
+            parsing_data = [parsing_data]
+        return [
+            (currency, account_number, list(stmts_vals))
+            for currency, account_number, stmts_vals in parsing_data
+        ]
+
     def _parse_file(self, data_file):
         """Parse a CAMT053 XML file."""
         try:
-            parser = self.env["account.statement.import.camt.parser"]
             _logger.debug("Try parsing with camt.")
-            return parser.parse(data_file)
+            return self._parse_camt_file(data_file)
         except ValueError:
             try:
-                with zipfile.ZipFile(BytesIO(data_file)) as data:
-                    currency = None
-                    account_number = None
-                    transactions = []
-                    for member in data.namelist():
-                        currency, account_number, new = self._parse_file(
-                            data.open(member).read()
-                        )
-                        transactions.extend(new)
-                return currency, account_number, transactions
+                return self._parse_camt_zip_file(data_file)
             # pylint: disable=except-pass
-            except (zipfile.BadZipFile, ValueError):
+            except ValueError:
                 pass
             # Not a camt file, returning super will call next candidate:
             _logger.debug("Statement file was not a camt file.", exc_info=True)
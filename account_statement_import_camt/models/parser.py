@@ -2,33 +2,53 @@
 # Copyright 2013-2016 Therp BV <https://therp.nl>
 # Copyright 2017 Open Net Sàrl
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
+import itertools
+import json
 import re
+from functools import lru_cache
+from io import BytesIO
 
 from lxml import etree
 
-from odoo import _, models
+from odoo import _, models, tools
+
+# Maximum number of transactions of the statements yielded by
+# iter_statements(): the bigger statements are yielded by parts
+STATEMENT_PART_SIZE = 1000
+
+
+@lru_cache(maxsize=1024)
+def _compile_xpath(ns, xpath_str):
+    """Return the compiled XPath expression of xpath_str for the namespace ns.
+    The expressions are compiled once per namespace (camt.052/053/054
+    versions) instead of at each node.xpath() call. The strings found are
+    plain strings, which don't keep a reference to their element."""
+    return etree.XPath(xpath_str, namespaces={"ns": ns}, smart_strings=False)
 
 
 class CamtParser(models.AbstractModel):
     _name = "account.statement.import.camt.parser"
     _description = "Account Bank Statement Import CAMT parser"
 
+    def xpath(self, ns, node, xpath_str):
+        """Evaluate xpath_str on node, 'ns' being the prefix of the
+        namespace ns in the expression"""
+        return _compile_xpath(ns, xpath_str)(node)
+
     def parse_amount(self, ns, node):
         """Parse element that contains Amount and CreditDebitIndicator."""
         if node is None:
             return 0.0
         sign = 1
         amount = 0.0
-        sign_node = node.xpath("ns:CdtDbtInd", namespaces={"ns": ns})
+        sign_node = self.xpath(ns, node, "ns:CdtDbtInd")
         if not sign_node:
-            sign_node = node.xpath("../../ns:CdtDbtInd", namespaces={"ns": ns})
+            sign_node = self.xpath(ns, node, "../../ns:CdtDbtInd")
         if sign_node and sign_node[0].text == "DBIT":
             sign = -1
-        amount_node = node.xpath("ns:Amt", namespaces={"ns": ns})
+        amount_node = self.xpath(ns, node, "ns:Amt")
         if not amount_node:
-            amount_node = node.xpath(
-                "./ns:AmtDtls/ns:TxAmt/ns:Amt", namespaces={"ns": ns}
-            )
+            amount_node = self.xpath(ns, node, "./ns:AmtDtls/ns:TxAmt/ns:Amt")
         if amount_node:
             amount = sign * float(amount_node[0].text)
         return amount
@@ -42,7 +62,7 @@ class CamtParser(models.AbstractModel):
         if not isinstance(xpath_str, (list, tuple)):
             xpath_str = [xpath_str]
         for search_str in xpath_str:
-            found_node = node.xpath(search_str, namespaces={"ns": ns})
+            found_node = self.xpath(ns, node, search_str)
             if found_node:
                 if isinstance(found_node[0], str):
                     attr_value = found_node[0]
@@ -53,128 +73,105 @@ class CamtParser(models.AbstractModel):
                 obj[attr_name] = attr_value
                 break
 
+    def get_node_values(self, ns, node):
+        """Walk the descendants of node once and return their texts, by path.
+
+        The keys are the paths of the elements relative to node, made of
+        their local names (e.g. 'RmtInf/Ustrd'); only the elements of the
+        namespace ns are considered, like in the XPath expressions. The
+        values are the lists of (position, text) of the elements found at
+        this path, the position being the index of the element in the
+        document order."""
+        values = {}
+        ns_prefix = "{%s}" % ns
+        prefix_len = len(ns_prefix)
+        paths = {node: ""}
+        # iterdescendants() filters the elements of the namespace in C;
+        # the descendants of foreign elements have no known parent path
+        for position, child in enumerate(node.iterdescendants(ns_prefix + "*")):
+            path = paths.get(child.getparent())
+            if path is None:
+                continue
+            path += child.tag[prefix_len:]
+            paths[child] = path + "/"
+            values.setdefault(path, []).append((position, child.text))
+        return values
+
+    def get_values(self, values, path_str):
+        """Return the texts found in values for path_str, in document order.
+
+        path_str may be a union of paths separated by '|', as in XPath."""
+        if "|" not in path_str:
+            return [text for __, text in values.get(path_str, ())]
+        found = []
+        for path in path_str.split("|"):
+            found.extend(values.get(path, ()))
+        found.sort()
+        return [text for __, text in found]
+
+    def add_value_from_values(self, values, path_str, obj, attr_name, join_str=None):
+        """Add value to object from the first or all texts found in values,
+        the result of get_node_values().
+
+        Same as add_value_from_node(), path_str being the paths relative
+        to the walked node instead of XPath expressions."""
+        if not isinstance(path_str, (list, tuple)):
+            path_str = [path_str]
+        for search_str in path_str:
+            found = self.get_values(values, search_str)
+            if found:
+                if join_str is None:
+                    obj[attr_name] = found[0]
+                else:
+                    obj[attr_name] = join_str.join(found)
+                break
+
     def parse_transaction_details(self, ns, node, transaction):
         """Parse TxDtls node."""
+        values = self.get_node_values(ns, node)
+        self.parse_transaction_details_values(ns, node, values, transaction)
+
+    def parse_transaction_details_values(self, ns, node, values, transaction):
+        """Parse TxDtls node from the texts of its descendants, the result
+        of get_node_values()."""
         # message
-        self.add_value_from_node(
-            ns,
-            node,
-            [
-                "./ns:RmtInf/ns:Ustrd|./ns:RtrInf/ns:AddtlInf",
-                "./ns:Refs/ns:InstrId",
-            ],
+        self.add_value_from_values(
+            values,
+            ["RmtInf/Ustrd|RtrInf/AddtlInf", "Refs/InstrId"],
             transaction,
             "payment_ref",
             join_str="\n",
         )
+        for path_str, key, join_str in [
+            ("RmtInf/Ustrd", "RmtInf/Ustrd", " "),
+            ("RmtInf/Strd/CdtrRefInf/Ref", "RmtInf/Strd/CdtrRefInf/Ref", " "),
+            ("AddtlTxInf", "AddtlTxInf", " "),
+            ("RtrInf/Rsn/Cd", "RtrInf/Rsn/Cd", None),
+            ("RtrInf/Rsn/Cd", "RtrInf/Rsn/Prtry", None),
+            ("RtrInf/AddtlInf", "RtrInf/AddtlInf", " "),
+            ("Refs/MsgId", "Refs/MsgId", None),
+            ("Refs/AcctSvcrRef", "Refs/AcctSvcrRef", None),
+            ("Refs/EndToEndId", "Refs/EndToEndId", None),
+            ("Refs/InstrId", "Refs/InstrId", None),
+            ("Refs/TxId", "Refs/TxId", None),
+            ("Refs/MntId", "Refs/MntId", None),
+            ("Refs/ChqNb", "Refs/ChqNb", None),
+        ]:
+            if path_str in values:
+                self.add_value_from_values(
+                    values, path_str, transaction["narration"], key, join_str=join_str
+                )
 
-        self.add_value_from_node(
-            ns,
-            node,
-            ["./ns:RmtInf/ns:Ustrd"],
-            transaction["narration"],
-            "%s (RmtInf/Ustrd)" % _("Unstructured Reference"),
-            join_str=" ",
-        )
-        self.add_value_from_node(
-            ns,
-            node,
-            ["./ns:RmtInf/ns:Strd/ns:CdtrRefInf/ns:Ref"],
-            transaction["narration"],
-            "%s (RmtInf/Strd/CdtrRefInf/Ref)" % _("Structured Reference"),
-            join_str=" ",
-        )
-        self.add_value_from_node(
-            ns,
-            node,
-            ["./ns:AddtlTxInf"],
-            transaction["narration"],
-            "%s (AddtlTxInf)" % _("Additional Transaction Information"),
-            join_str=" ",
-        )
-        self.add_value_from_node(
-            ns,
-            node,
-            ["./ns:RtrInf/ns:Rsn/ns:Cd"],
-            transaction["narration"],
-            "%s (RtrInf/Rsn/Cd)" % _("Return Reason Code"),
-        )
-        self.add_value_from_node(
-            ns,
-            node,
-            ["./ns:RtrInf/ns:Rsn/ns:Cd"],
-            transaction["narration"],
-            "%s (RtrInf/Rsn/Prtry)" % _("Return Reason Code (Proprietary)"),
-        )
-        self.add_value_from_node(
-            ns,
-            node,
-            ["./ns:RtrInf/ns:AddtlInf"],
-            transaction["narration"],
-            "%s (RtrInf/AddtlInf)" % _("Return Reason Additional Information"),
-            join_str=" ",
-        )
-        self.add_value_from_node(
-            ns,
-            node,
-            ["./ns:Refs/ns:MsgId"],
-            transaction["narration"],
-            "%s (Refs/MsgId)" % _("Msg Id"),
-        )
-        self.add_value_from_node(
-            ns,
-            node,
-            ["./ns:Refs/ns:AcctSvcrRef"],
-            transaction["narration"],
-            "%s (Refs/AcctSvcrRef)" % _("Account Servicer Reference"),
-        )
-        self.add_value_from_node(
-            ns,
-            node,
-            ["./ns:Refs/ns:EndToEndId"],
-            transaction["narration"],
-            "%s (Refs/EndToEndId)" % _("End To End Id"),
-        )
-        self.add_value_from_node(
-            ns,
-            node,
-            ["./ns:Refs/ns:InstrId"],
-            transaction["narration"],
-            "%s (Refs/InstrId)" % _("Instructed Id"),
-        )
-        self.add_value_from_node(
-            ns,
-            node,
-            ["./ns:Refs/ns:TxId"],
-            transaction["narration"],
-            "%s (Refs/TxId)" % _("Transaction Identification"),
-        )
-        self.add_value_from_node(
-            ns,
-            node,
-            ["./ns:Refs/ns:MntId"],
-            transaction["narration"],
-            "%s (Refs/MntId)" % _("Mandate Id"),
-        )
-        self.add_value_from_node(
-            ns,
-            node,
-            ["./ns:Refs/ns:ChqNb"],
-            transaction["narration"],
-            "%s (Refs/ChqNb)" % _("Cheque Number"),
-        )
-
-        self.add_value_from_node(
-            ns, node, ["./ns:AddtlTxInf"], transaction, "payment_ref", join_str="\n"
+        self.add_value_from_values(
+            values, "AddtlTxInf", transaction, "payment_ref", join_str="\n"
         )
         # eref
-        self.add_value_from_node(
-            ns,
-            node,
+        self.add_value_from_values(
+            values,
             [
-                "./ns:RmtInf/ns:Strd/ns:CdtrRefInf/ns:Ref",
-                "./ns:Refs/ns:EndToEndId",
-                "./ns:Ntry/ns:AcctSvcrRef",
+                "RmtInf/Strd/CdtrRefInf/Ref",
+                "Refs/EndToEndId",
+                "Ntry/AcctSvcrRef",
             ],
             transaction,
             "ref",
@@ -184,82 +181,125 @@ class CamtParser(models.AbstractModel):
             transaction["amount"] = amount
         # remote party values
         party_type = "Dbtr"
-        party_type_node = node.xpath("../../ns:CdtDbtInd", namespaces={"ns": ns})
+        party_type_node = self.xpath(ns, node, "../../ns:CdtDbtInd")
         if party_type_node and party_type_node[0].text != "CRDT":
             party_type = "Cdtr"
-        party_node = node.xpath(
-            "./ns:RltdPties/ns:%s" % party_type, namespaces={"ns": ns}
-        )
-        if party_node:
-            name_node = node.xpath(
-                "./ns:RltdPties/ns:{pt}/ns:Nm | ./ns:RltdPties/ns:{pt}/ns:Pty/ns:Nm".format(
-                    pt=party_type
-                ),
-                namespaces={"ns": ns},
+        party_path = "RltdPties/%s" % party_type
+        if party_path in values:
+            self.add_value_from_values(
+                values,
+                [
+                    "{pt}/Nm|{pt}/Pty/Nm".format(pt=party_path),
+                    "%s/PstlAdr/AdrLine" % party_path,
+                ],
+                transaction,
+                "partner_name",
             )
-            if name_node:
-                transaction["partner_name"] = name_node[0].text
-            else:
-                self.add_value_from_node(
-                    ns,
-                    party_node[0],
-                    "./ns:PstlAdr/ns:AdrLine",
-                    transaction,
-                    "partner_name",
-                )
-            self.add_value_from_node(
-                ns,
-                party_node[0],
-                "./ns:PstlAdr/ns:StrtNm|"
-                "./ns:PstlAdr/ns:BldgNb|"
-                "./ns:PstlAdr/ns:BldgNm|"
-                "./ns:PstlAdr/ns:PstBx|"
-                "./ns:PstlAdr/ns:PstCd|"
-                "./ns:PstlAdr/ns:TwnNm|"
-                "./ns:PstlAdr/ns:TwnLctnNm|"
-                "./ns:PstlAdr/ns:DstrctNm|"
-                "./ns:PstlAdr/ns:CtrySubDvsn|"
-                "./ns:PstlAdr/ns:Ctry|"
-                "./ns:PstlAdr/ns:AdrLine",
+            self.add_value_from_values(
+                values,
+                "|".join(
+                    "%s/PstlAdr/%s" % (party_path, name)
+                    for name in [
+                        "StrtNm",
+                        "BldgNb",
+                        "BldgNm",
+                        "PstBx",
+                        "PstCd",
+                        "TwnNm",
+                        "TwnLctnNm",
+                        "DstrctNm",
+                        "CtrySubDvsn",
+                        "Ctry",
+                        "AdrLine",
+                    ]
+                ),
                 transaction["narration"],
-                "%s (PstlAdr)" % _("Postal Address"),
+                "PstlAdr",
                 join_str=" | ",
             )
         # Get remote_account from iban or from domestic account:
-        account_node = node.xpath(
-            "./ns:RltdPties/ns:%sAcct/ns:Id" % party_type, namespaces={"ns": ns}
+        self.add_value_from_values(
+            values,
+            [
+                "RltdPties/%sAcct/Id/IBAN" % party_type,
+                "RltdPties/%sAcct/Id/Othr/Id" % party_type,
+            ],
+            transaction,
+            "account_number",
+        )
+
+    @tools.ormcache("self.env.lang")
+    def _get_narration_labels(self):
+        """Return the dict {key: label} of the values of the narrations, in
+        the language of the environment. The labels are translated once per
+        language and cached by the registry: the returned dict must not be
+        modified."""
+        return {
+            "RltdPties/Nm": "%s (RltdPties/Nm)" % _("Partner Name"),
+            "RltdPties/Acct": "%s (RltdPties/Acct)" % _("Partner Account Number"),
+            "BookgDt": "%s (BookgDt)" % _("Transaction Date"),
+            "Reference": _("Reference"),
+            "Communication": _("Communication"),
+            "BkTxCd": "%s (BkTxCd)" % _("Transaction Type"),
+            "AddtlNtryInf": "%s (AddtlNtryInf)" % _("Additional Entry Information"),
+            "RvslInd": "%s (RvslInd)" % _("Reversal Indicator"),
+            "RmtInf/Ustrd": "%s (RmtInf/Ustrd)" % _("Unstructured Reference"),
+            "RmtInf/Strd/CdtrRefInf/Ref": "%s (RmtInf/Strd/CdtrRefInf/Ref)"
+            % _("Structured Reference"),
+            "AddtlTxInf": "%s (AddtlTxInf)" % _("Additional Transaction Information"),
+            "RtrInf/Rsn/Cd": "%s (RtrInf/Rsn/Cd)" % _("Return Reason Code"),
+            "RtrInf/Rsn/Prtry": "%s (RtrInf/Rsn/Prtry)"
+            % _("Return Reason Code (Proprietary)"),
+            "RtrInf/AddtlInf": "%s (RtrInf/AddtlInf)"
+            % _("Return Reason Additional Information"),
+            "Refs/MsgId": "%s (Refs/MsgId)" % _("Msg Id"),
+            "Refs/AcctSvcrRef": "%s (Refs/AcctSvcrRef)"
+            % _("Account Servicer Reference"),
+            "Refs/EndToEndId": "%s (Refs/EndToEndId)" % _("End To End Id"),
+            "Refs/InstrId": "%s (Refs/InstrId)" % _("Instructed Id"),
+            "Refs/TxId": "%s (Refs/TxId)" % _("Transaction Identification"),
+            "Refs/MntId": "%s (Refs/MntId)" % _("Mandate Id"),
+            "Refs/ChqNb": "%s (Refs/ChqNb)" % _("Cheque Number"),
+            "PstlAdr": "%s (PstlAdr)" % _("Postal Address"),
+        }
+
+    def _is_narration_structured(self):
+        """Return whether the narrations are also stored as JSON in the field
+        camt_narration_data of the statement lines, besides the text in
+        their narration. Set in the context by iter_statements()."""
+        if "camt_structured_narration" in self.env.context:
+            return self.env.context["camt_structured_narration"]
+        return bool(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("account_statement_import_camt.structured_narration")
+        )
+
+    def render_narration(self, narration):
+        """Return the text of the narration values, a dict {key: value}
+        whose keys are the ones of _get_narration_labels(), or labels."""
+        labels = self._get_narration_labels()
+        return "\n".join(
+            "%s: %s" % (labels.get(key, key), val) for key, val in narration.items()
         )
-        if account_node:
-            iban_node = account_node[0].xpath("./ns:IBAN", namespaces={"ns": ns})
-            if iban_node:
-                transaction["account_number"] = iban_node[0].text
-            else:
-                self.add_value_from_node(
-                    ns,
-                    account_node[0],
-                    "./ns:Othr/ns:Id",
-                    transaction,
-                    "account_number",
-                )
 
     def generate_narration(self, transaction):
         # this block ensure compatibility with v13
-        transaction["narration"] = {
-            "%s (RltdPties/Nm)"
-            % _("Partner Name"): transaction.get("partner_name", ""),
-            "%s (RltdPties/Acct)"
-            % _("Partner Account Number"): transaction.get("account_number", ""),
-            "%s (BookgDt)" % _("Transaction Date"): transaction.get("date", ""),
-            _("Reference"): transaction.get("ref", ""),
-            _("Communication"): transaction.get("name", ""),
-            "%s (BkTxCd)"
-            % _("Transaction Type"): transaction.get("transaction_type", ""),
+        narration = {
+            "RltdPties/Nm": transaction.get("partner_name", ""),
+            "RltdPties/Acct": transaction.get("account_number", ""),
+            "BookgDt": transaction.get("date", ""),
+            "Reference": transaction.get("ref", ""),
+            "Communication": transaction.get("name", ""),
+            "BkTxCd": transaction.get("transaction_type", ""),
             **transaction["narration"],
         }
-
-        transaction["narration"] = "\n".join(
-            ["%s: %s" % (key, val) for key, val in transaction["narration"].items()]
-        )
+        transaction["narration"] = self.render_narration(narration)
+        if self._is_narration_structured():
+            # Rendered again in the language of the user when displayed
+            transaction["camt_narration_data"] = json.dumps(
+                narration, ensure_ascii=False, separators=(",", ":")
+            )
 
     def parse_entry(self, ns, node):
         """Parse an Ntry node and yield transactions"""
@@ -291,14 +331,14 @@ class CamtParser(models.AbstractModel):
             node,
             "./ns:AddtlNtryInf",
             transaction["narration"],
-            "%s (AddtlNtryInf)" % _("Additional Entry Information"),
+            "AddtlNtryInf",
         )
         self.add_value_from_node(
             ns,
             node,
             "./ns:RvslInd",
             transaction["narration"],
-            "%s (RvslInd)" % _("Reversal Indicator"),
+            "RvslInd",
         )
 
         self.add_value_from_node(
@@ -326,7 +366,7 @@ class CamtParser(models.AbstractModel):
             "-".join(transaction["transaction_type"].values()) or ""
         )
 
-        details_nodes = node.xpath("./ns:NtryDtls/ns:TxDtls", namespaces={"ns": ns})
+        details_nodes = self.xpath(ns, node, "./ns:NtryDtls/ns:TxDtls")
         if len(details_nodes) == 0:
             self.amend_transaction(transaction)
             self.generate_narration(transaction)
@@ -356,7 +396,7 @@ class CamtParser(models.AbstractModel):
             code_expr = (
                 './ns:Bal/ns:Tp/ns:CdOrPrtry/ns:Cd[text()="%s"]/../../..' % node_name
             )
-            balance_node = node.xpath(code_expr, namespaces={"ns": ns})
+            balance_node = self.xpath(ns, node, code_expr)
             if balance_node:
                 if node_name in ["OPBD", "PRCD"]:
                     start_balance_node = balance_node[0]
@@ -372,8 +412,8 @@ class CamtParser(models.AbstractModel):
             self.parse_amount(ns, end_balance_node),
         )
 
-    def parse_statement(self, ns, node):
-        """Parse a single Stmt node."""
+    def parse_statement_header(self, ns, node):
+        """Parse the values of a Stmt node other than its entries."""
         result = {}
         self.add_value_from_node(
             ns,
@@ -397,10 +437,10 @@ class CamtParser(models.AbstractModel):
         result["balance_start"], result["balance_end_real"] = self.get_balance_amounts(
             ns, node
         )
-        entry_nodes = node.xpath("./ns:Ntry", namespaces={"ns": ns})
-        transactions = []
-        for entry_node in entry_nodes:
-            transactions.extend(self.parse_entry(ns, entry_node))
+        return result
+
+    def set_statement_transactions(self, result, transactions):
+        """Set the transactions of a statement, and its date."""
         result["transactions"] = transactions
         result["date"] = None
         if transactions:
@@ -409,6 +449,15 @@ class CamtParser(models.AbstractModel):
             )[0]["date"]
         return result
 
+    def parse_statement(self, ns, node):
+        """Parse a single Stmt node."""
+        result = self.parse_statement_header(ns, node)
+        entry_nodes = self.xpath(ns, node, "./ns:Ntry")
+        transactions = []
+        for entry_node in entry_nodes:
+            transactions.extend(self.parse_entry(ns, entry_node))
+        return self.set_statement_transactions(result, transactions)
+
     def check_version(self, ns, root):
         """Validate validity of camt file."""
         # Check whether it is camt at all:
@@ -431,35 +480,169 @@ class CamtParser(models.AbstractModel):
         if root_0_0 != "GrpHdr":
             raise ValueError("expected GrpHdr, got: " + root_0_0)
 
-    def parse(self, data):
-        """Parse a camt.052 or camt.053 or camt.054 file."""
+    def iterparse(self, data):
+        """Start the incremental parsing of a camt file.
+
+        data is the content of the file, or a binary file object opened at
+        its start, which is then read as it is parsed. Return the namespace
+        of the file and the iterator on the "start" and "end" events of its
+        elements, positioned after the start of the group header. Raise
+        ValueError if data is not a camt file."""
         try:
-            root = etree.fromstring(data, parser=etree.XMLParser(recover=True))
+            return self._iterparse(data, recover=True)
         except etree.XMLSyntaxError:
+            if not isinstance(data, bytes):
+                data.seek(0)
+                data = data.read()
             try:
                 # ABNAmro is known to mix up encodings
-                root = etree.fromstring(data.decode("iso-8859-15").encode("utf-8"))
+                return self._iterparse(data.decode("iso-8859-15").encode("utf-8"))
             except etree.XMLSyntaxError:
-                root = None
-        if root is None:
+                pass
+        raise ValueError("Not a valid xml file, or not an xml file at all.")
+
+    def _iterparse(self, data, recover=False):
+        source = BytesIO(data) if isinstance(data, bytes) else data
+        events = etree.iterparse(source, events=("start", "end"), recover=recover)
+        # Read the start of the root, of the message and of the group header
+        started = []
+        for event, element in events:
+            if event != "start":
+                break
+            started.append(element)
+            if len(started) == 3:
+                break
+        if not started:
             raise ValueError("Not a valid xml file, or not an xml file at all.")
+        root = started[0]
         ns = root.tag[1 : root.tag.index("}")]
         self.check_version(ns, root)
+        return ns, events
+
+    def _clear_element(self, element):
+        """Free a parsed element, and its previous siblings"""
+        element.clear()
+        parent = element.getparent()
+        while element.getprevious() is not None:
+            del parent[0]
+
+    def iter_statements(self, data):
+        """Parse a camt.052 or camt.053 or camt.054 file incrementally,
+        and yield its statements which have transactions.
+
+        Each entry is parsed as soon as it is read, then removed from the
+        tree, as is each statement. A statement of more than
+        STATEMENT_PART_SIZE transactions is yielded by parts of
+        STATEMENT_PART_SIZE transactions: the parts after the first one
+        have the same values, and 'continued' set to True (see _parse_file()
+        of the import wizard). The memory used is thus bounded by the size
+        of a part, not by the size of the statements or of the file. data
+        is the content of the file or a file object, as in iterparse().
+        Raise ValueError right away if data is not a camt file."""
+        ns, events = self.iterparse(data)
+        # The mode of the narrations is read once per file
+        parser = self.with_context(
+            camt_structured_narration=self._is_narration_structured()
+        )
+        return parser._iter_statements(ns, events)
+
+    def _iter_statements(self, ns, events):
+        entry_tag = "{%s}Ntry" % ns
+        # Depth of the current element: the root, the message and
+        # the group header are started
+        level = 3
+        in_group_header = True
+        header = None
+        transactions = []
+        continued = False
+        try:
+            for event, element in events:
+                if event == "start":
+                    level += 1
+                    continue
+                level -= 1
+                if level == 3 and element.tag == entry_tag and not in_group_header:
+                    if header is None:
+                        # The entries follow the other values of the statement
+                        header = self.parse_statement_header(ns, element.getparent())
+                    transactions.extend(self.parse_entry(ns, element))
+                    self._clear_element(element)
+                    if len(transactions) >= STATEMENT_PART_SIZE:
+                        yield self._get_statement_part(header, transactions, continued)
+                        transactions = []
+                        continued = True
+                elif level == 2:
+                    if in_group_header:
+                        in_group_header = False
+                    else:
+                        if header is None:
+                            header = self.parse_statement_header(ns, element)
+                        if transactions:
+                            yield self._get_statement_part(
+                                header, transactions, continued
+                            )
+                        header = None
+                        transactions = []
+                        continued = False
+                    self._clear_element(element)
+        except etree.XMLSyntaxError as e:
+            raise ValueError("Not a valid xml file: %s" % e) from e
+
+    def _get_statement_part(self, header, transactions, continued):
+        """Return the values of a statement, or of a part of a statement,
+        with the given transactions"""
+        result = dict(header)
+        if continued:
+            result["continued"] = True
+        return self.set_statement_transactions(result, transactions)
+
+    def parse(self, data):
+        """Parse a camt.052 or camt.053 or camt.054 file."""
         statements = []
         currency = None
         account_number = None
-        for node in root[0][1:]:
-            statement = self.parse_statement(ns, node)
-            if len(statement["transactions"]):
-                if "currency" in statement:
-                    currency = statement.pop("currency")
-                if "account_number" in statement:
-                    account_number = statement.pop("account_number")
-                statements.append(statement)
+        for statement in self.iter_statements(data):
+            if "currency" in statement:
+                currency = statement.pop("currency")
+            if "account_number" in statement:
+                account_number = statement.pop("account_number")
+            if statement.pop("continued", False):
+                # Join the parts of a big statement
+                transactions = statements[-1]["transactions"]
+                transactions.extend(statement["transactions"])
+                self.set_statement_transactions(statements[-1], transactions)
+                continue
+            statements.append(statement)
         return currency, account_number, statements
 
+    def parse_stream(self, data):
+        """Parse a camt file incrementally, while it is imported.
+
+        Return a generator of (currency, account number, statements)
+        triplets, one for each run of statements of the same bank account,
+        the statements being a generator too (see _parse_file() of the
+        import wizard). Raise ValueError right away if data is not a camt
+        file."""
+        return self._group_statements(self.iter_statements(data))
+
+    def _group_statements(self, statements):
+        # As in parse(), a statement without currency or account number
+        # gets the ones of the previous statements
+        account = {"currency": None, "account_number": None}
+
+        def get_account(statement):
+            for key in account:
+                if key in statement:
+                    account[key] = statement.pop(key)
+            return account["currency"], account["account_number"]
+
+        for (currency, account_number), account_statements in itertools.groupby(
+            statements, get_account
+        ):
+            yield currency, account_number, account_statements
+
     def amend_transaction(self, transaction):
         if transaction.get("payment_ref") == "/":
             transaction["payment_ref"] = transaction["narration"].get(
-                "%s (AddtlNtryInf)" % _("Additional Entry Information"), "/"
+                "AddtlNtryInf", "/"
             )
@@ -1 +1,2 @@
 from . import test_import_bank_statement
+from . import test_benchmark
@@ -0,0 +1,276 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
+import logging
+import math
+import tempfile
+import time
+from datetime import date, timedelta
+
+from odoo.tests import tagged
+
+from odoo.addons.account_statement_import_file.tests.common import (
+    PeakRSSMeter,
+    StatementImportBenchmarkCase,
+)
+
+from ..models.parser import _compile_xpath
+
+_logger = logging.getLogger(__name__)
+
+# Number of entries of each statement of the synthetic files
+CAMT_BENCHMARK_STATEMENT_SIZE = 100
+# Size of the synthetic file of TestCamtBigFile (bytes)
+CAMT_BIG_FILE_SIZE = 200 * 1024 * 1024
+CAMT_ROOTS = {
+    "053": ("camt.053.001.02", "BkToCstmrStmt", "Stmt"),
+    "054": ("camt.054.001.04", "BkToCstmrDbtCdtNtfctn", "Ntfctn"),
+}
+CAMT_ENTRY = """
+<Ntry>
+    <Amt Ccy="%(currency)s">%(amount).2f</Amt>
+    <CdtDbtInd>CRDT</CdtDbtInd>
+    <Sts>BOOK</Sts>
+    <BookgDt><Dt>%(date)s</Dt></BookgDt>
+    <ValDt><Dt>%(date)s</Dt></ValDt>
+    <AcctSvcrRef>%(ref)s</AcctSvcrRef>
+    <BkTxCd>
+        <Domn><Cd>PMNT</Cd><Fmly><Cd>RCDT</Cd><SubFmlyCd>ESCT</SubFmlyCd></Fmly></Domn>
+    </BkTxCd>
+    <NtryDtls>
+        <TxDtls>
+            <Refs>
+                <AcctSvcrRef>%(ref)s</AcctSvcrRef>
+                <EndToEndId>E2E-%(ref)s</EndToEndId>
+            </Refs>
+            <AmtDtls><TxAmt><Amt Ccy="%(currency)s">%(amount).2f</Amt></TxAmt></AmtDtls>
+            <RltdPties>
+                <Dbtr>
+                    <Nm>Benchmark Partner %(partner)d</Nm>
+                    <PstlAdr>
+                        <StrtNm>Main Street %(partner)d</StrtNm>
+                        <Ctry>NL</Ctry>
+                    </PstlAdr>
+                </Dbtr>
+                <DbtrAcct><Id><IBAN>NL%(partner)016d</IBAN></Id></DbtrAcct>
+            </RltdPties>
+            <RmtInf><Ustrd>Invoice %(ref)s</Ustrd></RmtInf>
+            <AddtlTxInf>Payment of invoice %(ref)s</AddtlTxInf>
+        </TxDtls>
+    </NtryDtls>
+</Ntry>"""
+
+
+def iter_camt_file_parts(
+    nb_lines,
+    account_number,
+    currency_code,
+    message="053",
+    statement_size=CAMT_BENCHMARK_STATEMENT_SIZE,
+):
+    """Yield the lines of a synthetic camt file of nb_lines entries,
+    split in statements of statement_size entries"""
+    version, root_tag, statement_tag = CAMT_ROOTS[message]
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<Document xmlns="urn:iso:std:iso:20022:tech:xsd:%s">\n'
+        "<%s>\n"
+        "<GrpHdr><MsgId>BENCH-%d</MsgId>"
+        "<CreDtTm>2024-01-01T00:00:00</CreDtTm></GrpHdr>"
+        % (version, root_tag, nb_lines)
+    )
+    for start in range(0, nb_lines, statement_size):
+        indexes = range(start, min(start + statement_size, nb_lines))
+        st_date = date(2024, 1, 1) + timedelta(days=start // statement_size)
+        yield (
+            "<%s><Id>BENCH-%d/%d</Id>"
+            "<Acct><Id><IBAN>%s</IBAN></Id></Acct>"
+            % (statement_tag, nb_lines, start, account_number)
+        )
+        if message == "053":
+            total = sum(10.0 + index % 100 for index in indexes)
+            for code, amount in (("OPBD", 0.0), ("CLBD", total)):
+                yield (
+                    "<Bal><Tp><CdOrPrtry><Cd>%s</Cd></CdOrPrtry></Tp>"
+                    '<Amt Ccy="%s">%.2f</Amt><CdtDbtInd>CRDT</CdtDbtInd>'
+                    "<Dt><Dt>%s</Dt></Dt></Bal>"
+                    % (code, currency_code, amount, st_date)
+                )
+        yield from (
+            CAMT_ENTRY
+            % {
+                "currency": currency_code,
+                "amount": 10.0 + index % 100,
+                "date": st_date,
+                "ref": "BENCH-%d-%d" % (nb_lines, index),
+                "partner": index % 500,
+            }
+            for index in indexes
+        )
+        yield "</%s>" % statement_tag
+    yield "</%s>\n</Document>\n" % root_tag
+
+
+def generate_camt_file(
+    nb_lines,
+    account_number,
+    currency_code,
+    message="053",
+    statement_size=CAMT_BENCHMARK_STATEMENT_SIZE,
+):
+    """Return a synthetic camt file of nb_lines entries, split
+    in statements of statement_size entries"""
+    return "\n".join(
+        iter_camt_file_parts(
+            nb_lines, account_number, currency_code, message, statement_size
+        )
+    ).encode("utf-8")
+
+
+@tagged("-standard", "statement_import_benchmark")
+class TestCamtBenchmark(StatementImportBenchmarkCase):
+    """Run with --test-tags statement_import_benchmark"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.account_number = "NL12BNCH0123456789"
+        cls.journal = cls._create_benchmark_journal(
+            "BNCAMT", account_number=cls.account_number
+        )
+        cls.currency_code = cls.env.company.currency_id.name
+
+    def test_benchmark_camt053(self):
+        self._check_import_benchmark(
+            "camt.053",
+            lambda nb_lines: generate_camt_file(
+                nb_lines, self.account_number, self.currency_code
+            ),
+            "benchmark-camt053.xml",
+        )
+
+    def test_benchmark_camt054(self):
+        self._check_import_benchmark(
+            "camt.054",
+            lambda nb_lines: generate_camt_file(
+                nb_lines, self.account_number, self.currency_code, message="054"
+            ),
+            "benchmark-camt054.xml",
+        )
+
+    def test_benchmark_camt053_parser(self):
+        """Parse a statement of 10000 entries: the XPath expressions
+        are only compiled once"""
+        data = generate_camt_file(
+            10000, self.account_number, self.currency_code, statement_size=10000
+        )
+        parser = self.env["account.statement.import.camt.parser"]
+        _compile_xpath.cache_clear()
+        time_start = time.perf_counter()
+        currency, account_number, statements = parser.parse(data)
+        duration = time.perf_counter() - time_start
+        _logger.info(
+            "Parsing of a camt.053 statement of 10000 entries: %.3fs, "
+            "%d XPath expressions compiled",
+            duration,
+            _compile_xpath.cache_info().currsize,
+        )
+        self.assertEqual(len(statements[0]["transactions"]), 10000)
+        self.assertLess(_compile_xpath.cache_info().currsize, 100)
+
+    def test_benchmark_camt053_stream(self):
+        """Parse a file of 10000 entries while it is imported: the peak of
+        the resident memory is the one of a statement, not the one of the
+        whole file"""
+        self._check_stream_peak_rss(CAMT_BENCHMARK_STATEMENT_SIZE)
+
+    def test_benchmark_camt053_stream_one_statement(self):
+        """Parse a statement of 10000 entries while it is imported: the peak
+        of the resident memory is the one of a part of the statement"""
+        self._check_stream_peak_rss(10000)
+
+    def _check_stream_peak_rss(self, statement_size):
+        data = generate_camt_file(
+            10000, self.account_number, self.currency_code, statement_size
+        )
+        parser = self.env["account.statement.import.camt.parser"]
+
+        def parse_list():
+            return sum(len(st["transactions"]) for st in parser.parse(data)[2])
+
+        def parse_stream():
+            return sum(
+                len(st["transactions"])
+                for __, __, statements in parser.parse_stream(data)
+                for st in statements
+            )
+
+        # The memory freed by a parsing can be kept by the process and
+        # reused by the next one: the stream, which uses less, runs first
+        peaks = {}
+        for mode, parse in [("stream", parse_stream), ("list", parse_list)]:
+            with PeakRSSMeter() as meter:
+                self.assertEqual(parse(), 10000)
+            peaks[mode] = meter.increase
+        _logger.info(
+            "Parsing of a camt.053 file of 10000 entries, in statements of %d "
+            "entries: peak RSS increase %.1f MiB as a list, %.1f MiB as a stream",
+            statement_size,
+            peaks["list"] / 1024 / 1024,
+            peaks["stream"] / 1024 / 1024,
+        )
+        self.assertLess(peaks["stream"], peaks["list"] / 4)
+
+
+@tagged("-standard", "statement_import_big_file")
+class TestCamtBigFile(StatementImportBenchmarkCase):
+    """Import a synthetic camt.053 file of CAMT_BIG_FILE_SIZE bytes, which
+    takes a while. Run with --test-tags statement_import_big_file"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.account_number = "NL12BNCH0123456789"
+        cls.journal = cls._create_benchmark_journal(
+            "BNCAMTB", account_number=cls.account_number
+        )
+        cls.currency_code = cls.env.company.currency_id.name
+
+    def test_import_big_file_peak_rss(self):
+        """The statements of the file are parsed and created while the file
+        is read: the resident memory of the import grows with the size of
+        a statement, not with the size of the file"""
+        entry_size = len(
+            generate_camt_file(2, self.account_number, self.currency_code)
+        ) - len(generate_camt_file(1, self.account_number, self.currency_code))
+        nb_lines = CAMT_BIG_FILE_SIZE // entry_size
+        # The file is written by parts, so that its generation doesn't
+        # leave the memory of the process grown before the measure
+        with tempfile.TemporaryFile() as camt_file:
+            for part in iter_camt_file_parts(
+                nb_lines, self.account_number, self.currency_code
+            ):
+                camt_file.write(part.encode("utf-8") + b"\n")
+            camt_file.seek(0)
+            data = camt_file.read()
+        wizard = (
+            self.env["account.statement.import"]
+            .with_context(journal_id=self.journal.id)
+            .create({"statement_filename": "big-camt053.xml"})
+        )
+        result = {"statement_ids": [], "notifications": []}
+        self.env.flush_all()
+        with PeakRSSMeter() as meter:
+            wizard.import_single_file(data, result)
+            self.env.flush_all()
+        _logger.info(
+            "Import of a camt.053 file of %.1f MiB (%d entries): "
+            "peak RSS increase %.1f MiB",
+            len(data) / 1024 / 1024,
+            nb_lines,
+            meter.increase / 1024 / 1024,
+        )
+        self.assertEqual(
+            len(result["statement_ids"]),
+            math.ceil(nb_lines / CAMT_BENCHMARK_STATEMENT_SIZE),
+        )
+        # Parsing the whole tree takes about 10 times the size of the file
+        self.assertLess(meter.increase, len(data) / 2)
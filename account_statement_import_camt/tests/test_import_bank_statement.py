@@ -4,14 +4,27 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
 import base64
 import difflib
+import json
 import pprint
 import tempfile
+import zipfile
 from datetime import date
+from io import BytesIO
 from pathlib import Path
+from unittest.mock import patch
+
+from lxml import etree
 
 from odoo.modules.module import get_module_resource
 from odoo.tests.common import TransactionCase
 
+from odoo.addons.account_statement_import_camt.models import parser as camt_parser
+from odoo.addons.account_statement_import_file.wizard import (
+    account_statement_import as file_import,
+)
+
+from .test_benchmark import generate_camt_file
+
 
 class TestParserCommon(TransactionCase):
     @classmethod
@@ -94,6 +107,109 @@ class TestParser(TestParserCommon):
     def test_parse_no_ntry(self):
         self._do_parse_test("test-camt053-no-ntry", "golden-camt053-no-ntry.pydata")
 
+    def test_parse_stream(self):
+        """parse_stream() yields the statements of parse(), by account"""
+        for filename in ("test-camt053", "test-camt054", "test-camt053-txdtls"):
+            with open(
+                get_module_resource(
+                    "account_statement_import_camt", "test_files", filename
+                ),
+                "rb",
+            ) as datafile:
+                data = datafile.read()
+            self.assertEqual(
+                [
+                    (currency, account_number, list(statements))
+                    for currency, account_number, statements in (
+                        self.parser.parse_stream(data)
+                    )
+                ],
+                [self.parser.parse(data)],
+            )
+        with self.assertRaises(ValueError):
+            self.parser.parse_stream(b"Not a camt file")
+
+    def test_parse_stream_big_statement(self):
+        """A big statement is yielded by parts, which parse() joins"""
+        data = generate_camt_file(25, "NL77ABNA0574908765", "EUR", statement_size=25)
+        with patch.object(camt_parser, "STATEMENT_PART_SIZE", 10):
+            parts = [
+                statement
+                for __, __, statements in self.parser.parse_stream(data)
+                for statement in statements
+            ]
+            currency, account_number, statements = self.parser.parse(data)
+        self.assertEqual(
+            [(len(part["transactions"]), part.get("continued")) for part in parts],
+            [(10, None), (10, True), (5, True)],
+        )
+        self.assertEqual(len(statements), 1)
+        self.assertNotIn("continued", statements[0])
+        self.assertEqual(
+            statements[0]["transactions"],
+            [transaction for part in parts for transaction in part["transactions"]],
+        )
+        self.assertEqual(
+            {(part["name"], part["balance_end_real"]) for part in parts},
+            {(statements[0]["name"], statements[0]["balance_end_real"])},
+        )
+
+    def test_parse_structured_narration(self):
+        """The structured narrations render the text narrations"""
+        with open(
+            get_module_resource(
+                "account_statement_import_camt", "test_files", "test-camt053-txdtls"
+            ),
+            "rb",
+        ) as datafile:
+            data = datafile.read()
+        statements = self.parser.parse(data)[2]
+        self.env["ir.config_parameter"].sudo().set_param(
+            "account_statement_import_camt.structured_narration", "1"
+        )
+        structured_statements = self.parser.parse(data)[2]
+        for statement, structured_statement in zip(statements, structured_statements):
+            for transaction, structured_transaction in zip(
+                statement["transactions"], structured_statement["transactions"]
+            ):
+                self.assertEqual(
+                    structured_transaction["narration"], transaction["narration"]
+                )
+                self.assertEqual(
+                    self.parser.render_narration(
+                        json.loads(structured_transaction["camt_narration_data"])
+                    ),
+                    transaction["narration"],
+                )
+
+    def test_get_node_values(self):
+        ns = "urn:iso:std:iso:20022:tech:xsd:camt.053.001.02"
+        node = etree.fromstring(
+            """<TxDtls xmlns="%s" xmlns:x="urn:other">
+                <Refs><EndToEndId>E2E</EndToEndId></Refs>
+                <RmtInf><Ustrd>First</Ustrd><!-- comment --><Ustrd>Second</Ustrd></RmtInf>
+                <RtrInf><AddtlInf>Return</AddtlInf></RtrInf>
+                <x:RmtInf><Ustrd>Foreign</Ustrd></x:RmtInf>
+            </TxDtls>"""
+            % ns
+        )
+        values = self.parser.get_node_values(ns, node)
+        self.assertEqual(
+            self.parser.get_values(values, "RtrInf/AddtlInf|RmtInf/Ustrd"),
+            ["First", "Second", "Return"],
+        )
+        self.assertEqual(self.parser.get_values(values, "Refs/EndToEndId"), ["E2E"])
+        self.assertEqual(self.parser.get_values(values, "Refs/InstrId"), [])
+        transaction = {}
+        self.parser.add_value_from_values(
+            values,
+            ["Refs/InstrId", "RmtInf/Ustrd"],
+            transaction,
+            "payment_ref",
+            join_str=" ",
+        )
+        self.assertEqual(transaction, {"payment_ref": "First Second"})
+
 
 class TestImport(TransactionCase):
     """Run test to import camt import."""
@@ -188,6 +304,74 @@ class TestImport(TransactionCase):
                 )
             )
 
+    def test_statement_import_big_statement(self):
+        """The parts of a big statement are imported in the same statement,
+        even when they are created by different chunks"""
+        data = generate_camt_file(25, "NL77ABNA0574908765", "EUR", statement_size=25)
+        journal = self.env["account.journal"].search([("code", "=", "TBNKCAMT")])
+        parser = self.env["account.statement.import.camt.parser"]
+        transactions = parser.parse(data)[2][0]["transactions"]
+        # Two transactions of different parts are already imported
+        skipped = [transactions[3], transactions[22]]
+        for transaction in skipped:
+            journal._statement_line_import_update_unique_import_id(
+                transaction, "NL77ABNA0574908765"
+            )
+            self.env["account.bank.statement.line"].create(
+                {
+                    "journal_id": journal.id,
+                    "date": transaction["date"],
+                    "payment_ref": transaction["payment_ref"],
+                    "amount": transaction["amount"],
+                    "unique_import_id": transaction["unique_import_id"],
+                }
+            )
+        wizard = self.env["account.statement.import"].create(
+            {"statement_filename": "big-statement.xml"}
+        )
+        result = {"statement_ids": [], "notifications": []}
+        with patch.object(camt_parser, "STATEMENT_PART_SIZE", 10), patch.object(
+            file_import, "STATEMENT_IMPORT_CHUNK_LINES", 15
+        ):
+            wizard.import_single_file(data, result)
+        statement = self.env["account.bank.statement"].browse(result["statement_ids"])
+        self.assertEqual(len(statement), 1)
+        self.assertEqual(len(statement.line_ids), 23)
+        self.assertEqual(
+            sorted(statement.line_ids.mapped("sequence")), list(range(1, 24))
+        )
+        self.assertAlmostEqual(
+            statement.balance_start,
+            sum(transaction["amount"] for transaction in skipped),
+        )
+        self.assertAlmostEqual(
+            statement.balance_end_real,
+            sum(transaction["amount"] for transaction in transactions),
+        )
+        self.assertAlmostEqual(statement.balance_end, statement.balance_end_real)
+
+    def test_statement_import_structured_narration(self):
+        """Test the display of the narrations stored in JSON."""
+        self.env["ir.config_parameter"].sudo().set_param(
+            "account_statement_import_camt.structured_narration", "1"
+        )
+        testfile = get_module_resource(
+            "account_statement_import_camt", "test_files", "test-camt053"
+        )
+        with open(testfile, "rb") as datafile:
+            camt_file = base64.b64encode(datafile.read())
+        result = (
+            self.env["account.statement.import"]
+            .create({"statement_filename": "test import", "statement_file": camt_file})
+            ._import_file()
+        )
+        statement = self.env["account.bank.statement"].browse(result["statement_ids"])
+        self.assertTrue(statement.line_ids)
+        for line in statement.line_ids:
+            self.assertTrue(line.camt_narration_data)
+            self.assertTrue(line.narration)
+            self.assertIn("Transaction Date (BookgDt): ", line.camt_narration)
+
     def test_zip_import(self):
         """Test import of multiple statements from zip file."""
         testfile = get_module_resource(
@@ -204,3 +388,44 @@ class TestImport(TransactionCase):
 
         self.assertTrue(all([st.line_ids for st in bank_st_record]))
         self.assertEqual(bank_st_record[0].line_ids.mapped("sequence"), [1, 2, 3])
+
+    def test_zip_parse(self):
+        """The members of a zip file are parsed in the order of the archive,
+        each one with its currency and account"""
+        zip_file = BytesIO()
+        members_data = []
+        with zipfile.ZipFile(zip_file, "w") as archive:
+            for filename in ("test-camt053-txdtls", "test-camt053"):
+                testfile = get_module_resource(
+                    "account_statement_import_camt", "test_files", filename
+                )
+                with open(testfile, "rb") as datafile:
+                    members_data.append(datafile.read())
+                archive.writestr(filename, members_data[-1])
+        parser = self.env["account.statement.import.camt.parser"]
+        expected = [parser.parse(data) for data in members_data]
+        self.assertNotEqual(expected[0][:2], expected[1][:2])
+        wizard = self.env["account.statement.import"].create(
+            {"statement_filename": "test.zip"}
+        )
+        self.assertEqual(wizard._parse_camt_zip_file(zip_file.getvalue()), expected)
+
+    def test_detect_format(self):
+        """Test detection of camt files from their first bytes."""
+        wizard = self.env["account.statement.import"]
+        for filename, expected in (
+            ("test-camt053", "camt"),
+            ("test-camt054", "camt"),
+            ("test-camt053.zip", "camt_zip"),
+        ):
+            testfile = get_module_resource(
+                "account_statement_import_camt", "test_files", filename
+            )
+            with open(testfile, "rb") as datafile:
+                head = datafile.read(4096)
+            detected = [
+                file_format
+                for file_format, detect, _parse in wizard._get_statement_file_formats()
+                if detect(head)
+            ]
+            self.assertEqual(detected, [expected], filename)
@@ -16,8 +16,13 @@ class AccountStatementImport(models.TransientModel):
         """Create additional line in statement to set bank statement statement
         to 0 balance"""
 
+        # Only process the statements created by this call: a file can
+        # contain several accounts, or be imported by chunks
+        nb_statements = len(result["statement_ids"])
         super()._create_bank_statements(stmts_vals, result)
-        statements = self.env["account.bank.statement"].browse(result["statement_ids"])
+        statements = self.env["account.bank.statement"].browse(
+            result["statement_ids"][nb_statements:]
+        )
         for statement in statements:
             amount = sum(statement.line_ids.mapped("amount"))
             if statement.journal_id.transfer_line:
@@ -36,16 +41,25 @@ class AccountStatementImport(models.TransientModel):
                 statement.balance_end_real = statement.balance_start + amount
         return
 
-    def _complete_stmts_vals(self, stmts_vals, journal, account_number):
+    def _get_speeddict_maps(self, lines_vals):
+        maps = super()._get_speeddict_maps(lines_vals)
+        # The parser only reads partner references when isr_partner_ref is set
+        partner_refs = {
+            line_vals["partner_ref"]
+            for line_vals in lines_vals
+            if line_vals.get("partner_ref")
+        }
+        if partner_refs:
+            maps["partner_ref"] = partner_refs
+        return maps
+
+    def _complete_stmt_lines_vals(self, lines_vals, journal, speeddict):
         """Search partner from partner reference"""
-        stmts_vals = super()._complete_stmts_vals(stmts_vals, journal, account_number)
-        for st_vals in stmts_vals:
-            for line_vals in st_vals["transactions"]:
-                if "partner_ref" in line_vals:
-                    partner_ref = line_vals.pop("partner_ref")
-                    partner = self.env["res.partner"].search(
-                        [("ref", "=", partner_ref)], limit=1
-                    )
-                    line_vals["partner_id"] = partner.id
-
-        return stmts_vals
+        lines_vals = super()._complete_stmt_lines_vals(lines_vals, journal, speeddict)
+        for line_vals in lines_vals:
+            if "partner_ref" in line_vals:
+                partner_ref = line_vals.pop("partner_ref")
+                line_vals["partner_id"] = speeddict.get("partner_ref", {}).get(
+                    partner_ref, False
+                )
+        return lines_vals
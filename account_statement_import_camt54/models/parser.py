@@ -46,39 +46,30 @@ class CamtParser(models.AbstractModel):
             ) from err
         return isr[start:end].lstrip("0")
 
-    def parse_transaction_details(self, ns, node, transaction):
+    def parse_transaction_details_values(self, ns, node, values, transaction):
         """Put ESR in label and add aditional information to label
         if no esr is available
         """
-        super().parse_transaction_details(ns, node, transaction)
+        super().parse_transaction_details_values(ns, node, values, transaction)
         # put the esr in the label. odoo reconciles based on the label,
         # if there is no esr it tries to use the information textfield
 
-        isr_number = node.xpath(
-            "./ns:RmtInf/ns:Strd/ns:CdtrRefInf/ns:Ref", namespaces={"ns": ns}
-        )
+        isr_number = self.get_values(values, "RmtInf/Strd/CdtrRefInf/Ref")
+        trans_id_node = self.xpath(ns, node, "./../../ns:AcctSvcrRef")
         if len(isr_number):
-            transaction["payment_ref"] = isr_number[0].text
-            partner_ref = self._get_partner_ref(isr_number[0].text)
+            transaction["payment_ref"] = isr_number[0]
+            partner_ref = self._get_partner_ref(isr_number[0])
             if partner_ref:
                 transaction["partner_ref"] = partner_ref
         else:
-            xpath_exprs = [
-                "./ns:RmtInf/ns:Ustrd|./ns:RtrInf/ns:AddtlInf",
-                "./ns:AddtlNtryInf",
-                "/ns:Refs/ns:InstrId",
-            ]
             payment_ref = transaction["payment_ref"]
-            for xpath_expr in xpath_exprs:
-                found_node = node.xpath(xpath_expr, namespaces={"ns": ns})
-                if found_node:
-                    payment_ref = found_node[0].text
-                    break
-            trans_id_node = (
-                node.getparent()
-                .getparent()
-                .xpath("./ns:AcctSvcrRef", namespaces={"ns": ns})
-            )
+            found = self.get_values(values, "RmtInf/Ustrd|RtrInf/AddtlInf")
+            if not found:
+                found = self.get_values(values, "AddtlNtryInf")
+            if not found:
+                found = [x.text for x in self.xpath(ns, node, "/ns:Refs/ns:InstrId")]
+            if found:
+                payment_ref = found[0]
             if trans_id_node:
                 payment_ref = "{} ({})".format(payment_ref, trans_id_node[0].text)
             if payment_ref:
@@ -86,15 +77,13 @@ class CamtParser(models.AbstractModel):
         # End add esr to the label.
 
         # add transaction id to ref
-        self.add_value_from_node(
-            ns,
-            node,
-            [
-                "./../../ns:AcctSvcrRef",
-                "./ns:RmtInf/ns:Strd/ns:CdtrRefInf/ns:Ref",
-                "./ns:Refs/ns:EndToEndId",
-            ],
-            transaction,
-            "ref",
-        )
+        if trans_id_node:
+            transaction["ref"] = trans_id_node[0].text
+        else:
+            self.add_value_from_values(
+                values,
+                ["RmtInf/Strd/CdtrRefInf/Ref", "Refs/EndToEndId"],
+                transaction,
+                "ref",
+            )
         return True
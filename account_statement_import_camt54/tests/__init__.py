@@ -1,2 +1,3 @@
 from . import test_get_partner_ref
 from . import test_statement
+from . import test_benchmark
@@ -0,0 +1,33 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+from odoo.tests import tagged
+
+from odoo.addons.account_statement_import_camt.tests.test_benchmark import (
+    generate_camt_file,
+)
+from odoo.addons.account_statement_import_file.tests.common import (
+    StatementImportBenchmarkCase,
+)
+
+
+@tagged("-standard", "statement_import_benchmark")
+class TestCamt54Benchmark(StatementImportBenchmarkCase):
+    """Run with --test-tags statement_import_benchmark"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.account_number = "NL34BNCH0123456789"
+        cls.journal = cls._create_benchmark_journal(
+            "BNC54", account_number=cls.account_number
+        )
+        cls.journal.transfer_line = True
+        cls.currency_code = cls.env.company.currency_id.name
+
+    def test_benchmark_camt054_transfer_line(self):
+        self._check_import_benchmark(
+            "camt.054",
+            lambda nb_lines: generate_camt_file(
+                nb_lines, self.account_number, self.currency_code, message="054"
+            ),
+            "benchmark-camt054.xml",
+        )
@@ -6,7 +6,7 @@
 {
     "name": "Import Statement Files",
     "category": "Accounting",
-    "version": "16.0.1.0.2",
+    "version": "16.0.1.1.0",
     "license": "LGPL-3",
     "depends": ["account_statement_import_base"],
     "author": "Odoo SA, Akretion, Odoo Community Association (OCA)",
@@ -15,8 +15,13 @@
     "website": "https://github.com/OCA/bank-statement-import",
     "data": [
         "security/ir.model.access.csv",
+        "security/account_statement_import_job.xml",
+        "security/account_statement_import_log.xml",
+        "data/ir_cron.xml",
         "wizard/account_statement_import_view.xml",
         "views/account_journal.xml",
+        "views/account_statement_import_job.xml",
+        "views/account_statement_import_log.xml",
     ],
     "demo": [
         "demo/partner_bank.xml",
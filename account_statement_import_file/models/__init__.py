@@ -1 +1,5 @@
 from . import account_journal
+from . import account_statement_import_job
+from . import account_statement_import_log
+from . import ir_attachment
+from . import ir_binary
@@ -0,0 +1,285 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
+
+import json
+import logging
+import threading
+import zlib
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+
+logger = logging.getLogger(__name__)
+
+# First key of the advisory locks held by the processes importing the jobs,
+# the second key being the ID of the job
+JOB_LOCK_KEY = zlib.crc32(b"account.statement.import.job") & 0x7FFFFFFF
+
+
+class AccountStatementImportJob(models.Model):
+    _name = "account.statement.import.job"
+    _description = "Bank Statement File Import Job"
+    _order = "id desc"
+
+    name = fields.Char(string="File Name", required=True, readonly=True)
+    state = fields.Selection(
+        [
+            ("pending", "Pending"),
+            ("running", "Running"),
+            ("done", "Done"),
+            ("failed", "Failed"),
+        ],
+        default="pending",
+        required=True,
+        readonly=True,
+    )
+    company_id = fields.Many2one(
+        "res.company",
+        required=True,
+        readonly=True,
+        default=lambda self: self.env.company,
+    )
+    user_id = fields.Many2one(
+        "res.users",
+        string="Imported by",
+        required=True,
+        readonly=True,
+        default=lambda self: self.env.user,
+    )
+    journal_id = fields.Many2one(
+        "account.journal",
+        readonly=True,
+        help="Journal from which the import was started, if any.",
+    )
+    attachment_id = fields.Many2one("ir.attachment", string="File", readonly=True)
+    wizard_values = fields.Text(
+        readonly=True,
+        help="Values of the import wizard, in JSON, "
+        "except the statement file itself.",
+    )
+    chunk_size = fields.Integer(
+        default=lambda self: self._default_chunk_size(),
+        help="The statements of the file are imported by chunks of this "
+        "number of bank statements, and the import is committed after "
+        "each chunk.",
+    )
+    statement_ids = fields.Many2many(
+        "account.bank.statement", string="Bank Statements", readonly=True
+    )
+    statement_count = fields.Integer(
+        string="Imported Statements",
+        readonly=True,
+        help="Number of bank statements imported so far.",
+    )
+    notifications = fields.Text(readonly=True)
+    error = fields.Text(readonly=True)
+    date_start = fields.Datetime(string="Started on", readonly=True)
+    date_done = fields.Datetime(string="Finished on", readonly=True)
+
+    @api.model
+    def _default_chunk_size(self):
+        return int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("account_statement_import_file.job_chunk_size", 50)
+        )
+
+    def _trigger_cron(self):
+        self.env.ref(
+            "account_statement_import_file.ir_cron_process_statement_import_jobs"
+        )._trigger()
+
+    def _commit(self):
+        # Don't commit in tests, it would break the isolation of test cases
+        if not getattr(threading.current_thread(), "testing", False):
+            self.env.cr.commit()  # pylint: disable=invalid-commit
+
+    def _create_import_wizard(self):
+        self.ensure_one()
+        vals = json.loads(self.wizard_values or "{}")
+        vals.update(
+            {
+                "statement_file": self.attachment_id.datas,
+                "statement_filename": self.name,
+            }
+        )
+        return (
+            self.env["account.statement.import"]
+            .with_user(self.user_id)
+            .with_company(self.company_id)
+            .with_context(lang=self.user_id.lang, journal_id=self.journal_id.id)
+            .create(vals)
+        )
+
+    def _update_progress(self, result):
+        """Called by the import wizard after each chunk of chunk_size bank
+        statements has been imported. Commit the import every chunk_size
+        statements, so that users can follow the progress of the job."""
+        self.ensure_one()
+        statement_count = len(result["statement_ids"])
+        if statement_count - self.statement_count >= max(self.chunk_size, 1):
+            self.sudo().write(
+                {
+                    "statement_count": statement_count,
+                    "statement_ids": [(6, 0, result["statement_ids"])],
+                }
+            )
+            self._commit()
+
+    def _try_lock(self):
+        """Take the advisory lock of the job, held by the process importing
+        it. The lock belongs to the database session, so it is kept across
+        the commits of the import, and it is released by PostgreSQL if the
+        process dies. Return False if the job is locked by another process."""
+        self.ensure_one()
+        self.env.cr.execute(
+            "SELECT pg_try_advisory_lock(%s, %s)", (JOB_LOCK_KEY, self.id)
+        )
+        return self.env.cr.fetchone()[0]
+
+    def _unlock(self):
+        self.ensure_one()
+        self.env.cr.execute(
+            "SELECT pg_advisory_unlock(%s, %s)", (JOB_LOCK_KEY, self.id)
+        )
+
+    def _unlink_partial_statements(self):
+        """Delete the bank statements committed by an import which failed or
+        was interrupted, so that the job can be retried without importing
+        them twice."""
+        statements = self.sudo().statement_ids.exists()
+        if statements:
+            logger.info(
+                "Deleting the %d bank statement(s) partially imported by "
+                "bank statement import job(s) %s",
+                len(statements),
+                self.ids,
+            )
+            statements.line_ids.unlink()
+            statements.unlink()
+        self.sudo().write({"statement_ids": [(5, 0, 0)], "statement_count": 0})
+
+    def _set_failed(self, error):
+        """Set the job as failed, and delete its partially imported bank
+        statements. If they can't be deleted, they are kept on the job and
+        deleted when it is retried."""
+        self.ensure_one()
+        try:
+            with self.env.cr.savepoint():
+                self._unlink_partial_statements()
+        except Exception:
+            logger.exception(
+                "Could not delete the bank statements partially imported by "
+                "bank statement import job %s",
+                self.id,
+            )
+        self.write(
+            {
+                "state": "failed",
+                "error": error,
+                "date_done": fields.Datetime.now(),
+            }
+        )
+
+    def _process(self):
+        self.ensure_one()
+        if not self._try_lock():
+            # Being processed by another process
+            return False
+        try:
+            # The job may have been processed in the meantime
+            self.invalidate_recordset(["state"])
+            if self.state != "pending":
+                return False
+            return self._process_locked()
+        finally:
+            self._unlock()
+
+    def _process_locked(self):
+        self.write(
+            {
+                "state": "running",
+                "date_start": fields.Datetime.now(),
+                "statement_count": 0,
+                "error": False,
+            }
+        )
+        self._commit()
+        logger.info("Start bank statement import job %s (%s)", self.id, self.name)
+        try:
+            wizard = self._create_import_wizard()
+            result = wizard.with_context(statement_import_job_id=self.id)._import_file()
+        except Exception as e:
+            if isinstance(e, UserError):
+                error = str(e)
+            else:
+                logger.exception("Bank statement import job %s failed", self.id)
+                error = _("Unexpected error: %s") % e
+            self.env.cr.rollback()
+            # The chunks of statements committed before the error are deleted
+            self._set_failed(error)
+            self._commit()
+            return False
+        attachment = self.attachment_id
+        self.write(
+            {
+                "state": "done",
+                "statement_count": len(result["statement_ids"]),
+                "statement_ids": [(6, 0, result["statement_ids"])],
+                "notifications": "\n\n".join(result["notifications"]) or False,
+                "date_done": fields.Datetime.now(),
+                "attachment_id": False,
+            }
+        )
+        # The wizard has attached the file to the first bank statement
+        attachment.unlink()
+        self._commit()
+        logger.info(
+            "Bank statement import job %s done: %d statement(s) imported",
+            self.id,
+            len(result["statement_ids"]),
+        )
+        return True
+
+    def _fail_interrupted_jobs(self):
+        """Set as failed the running jobs whose process has died, for example
+        when it was killed by the time limit or the memory limit of the
+        server: nothing holds their lock anymore."""
+        for job in self.search([("state", "=", "running")], order="id"):
+            if not job._try_lock():
+                continue
+            try:
+                job.invalidate_recordset(["state"])
+                if job.state != "running":
+                    continue
+                logger.warning("Bank statement import job %s was interrupted", job.id)
+                job._set_failed(
+                    _(
+                        "The import was interrupted, for example by the time "
+                        "limit or the memory limit of the server."
+                    )
+                )
+                job._commit()
+            finally:
+                job._unlock()
+
+    @api.model
+    def _cron_process_jobs(self):
+        self._fail_interrupted_jobs()
+        jobs = self.search([("state", "=", "pending")], order="id")
+        for job in jobs:
+            job._process()
+
+    def action_retry(self):
+        jobs = self.filtered(lambda job: job.state == "failed")
+        # The statements which could not be deleted when the job failed
+        jobs.filtered("statement_ids")._unlink_partial_statements()
+        jobs.write({"state": "pending", "error": False, "date_done": False})
+        self._trigger_cron()
+
+    def action_view_statements(self):
+        self.ensure_one()
+        action = self.env["ir.actions.actions"]._for_xml_id(
+            "account.action_bank_statement_tree"
+        )
+        action["domain"] = [("id", "in", self.statement_ids.ids)]
+        return action
@@ -0,0 +1,161 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
+
+import base64
+import logging
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+
+logger = logging.getLogger(__name__)
+
+
+class AccountStatementImportLog(models.Model):
+    _name = "account.statement.import.log"
+    _description = "Bank Statement File Import Log"
+    _order = "id desc"
+
+    name = fields.Char(string="File Name", required=True, readonly=True)
+    state = fields.Selection(
+        [("done", "Done"), ("failed", "Failed")],
+        required=True,
+        readonly=True,
+    )
+    company_id = fields.Many2one(
+        "res.company",
+        required=True,
+        readonly=True,
+        default=lambda self: self.env.company,
+    )
+    user_id = fields.Many2one(
+        "res.users",
+        string="Imported by",
+        required=True,
+        readonly=True,
+        default=lambda self: self.env.user,
+    )
+    journal_id = fields.Many2one("account.journal", readonly=True)
+    job_id = fields.Many2one(
+        "account.statement.import.job",
+        string="Import Job",
+        readonly=True,
+        ondelete="set null",
+        help="Background job which imported the file, if any.",
+    )
+    file_format = fields.Char(
+        readonly=True,
+        help="Format detected for the file. Empty when the file was "
+        "parsed by the chain of parsers.",
+    )
+    file_sha256 = fields.Char(string="File SHA-256", readonly=True)
+    attachment_id = fields.Many2one(
+        "ir.attachment",
+        string="File",
+        readonly=True,
+        ondelete="set null",
+        help="The imported file, which is attached to the first bank "
+        "statement, or to this log if the import failed.",
+    )
+    wizard_values = fields.Text(
+        readonly=True,
+        help="Values of the import wizard, in JSON, "
+        "except the statement file itself.",
+    )
+    statement_ids = fields.Many2many(
+        "account.bank.statement", string="Bank Statements", readonly=True
+    )
+    statement_count = fields.Integer(string="Imported Statements", readonly=True)
+    lines_parsed = fields.Integer(readonly=True)
+    lines_created = fields.Integer(readonly=True)
+    duplicates_skipped = fields.Integer(
+        readonly=True, help="Number of already imported transactions."
+    )
+    duration = fields.Float(string="Duration (s)", readonly=True, digits=(16, 3))
+    query_count = fields.Integer(string="SQL Queries", readonly=True)
+    stats = fields.Text(
+        string="Statistics",
+        readonly=True,
+        help="Duration and number of SQL queries of each phase of "
+        "the import, in JSON.",
+    )
+    server_version = fields.Char(
+        readonly=True, help="Version of the server which imported the file."
+    )
+    notifications = fields.Text(readonly=True)
+    error = fields.Text(readonly=True)
+
+    @api.model
+    def _create_failed_log(self, vals, file_data):
+        """Create the log of a failed import, with the file attached to it so
+        that the import can be replayed. The import transaction is rolled back,
+        so the log is created and committed with a new cursor."""
+        with self.env.registry.cursor() as cr:
+            log = self.with_env(self.env(cr=cr))._create_with_file(vals, file_data)
+        return self.browse(log.id)
+
+    def _create_with_file(self, vals, file_data):
+        log = self.sudo().create(vals)
+        log.attachment_id = (
+            self.env["ir.attachment"]
+            .sudo()
+            .create(
+                {
+                    "name": log.name,
+                    "res_model": log._name,
+                    "res_id": log.id,
+                    "company_id": log.company_id.id,
+                    "datas": base64.b64encode(file_data),
+                }
+            )
+        )
+        return log
+
+    def action_replay(self):
+        """Import again the file of failed imports, in background jobs"""
+        jobs = self.env["account.statement.import.job"]
+        for log in self.filtered(
+            lambda log: log.state == "failed" and log.attachment_id
+        ):
+            job = jobs.create(
+                {
+                    "name": log.name,
+                    "company_id": log.company_id.id,
+                    "journal_id": log.journal_id.id,
+                    "wizard_values": log.wizard_values,
+                }
+            )
+            job.attachment_id = log.attachment_id.copy(
+                {"res_model": job._name, "res_id": job.id}
+            )
+            logger.info(
+                "Replay of bank statement import log %s in job %s", log.id, job.id
+            )
+            jobs |= job
+        if not jobs:
+            raise UserError(
+                _(
+                    "Only the failed imports whose file is still stored "
+                    "can be replayed."
+                )
+            )
+        jobs._trigger_cron()
+        action = {
+            "type": "ir.actions.act_window",
+            "name": _("Bank Statement Import Jobs"),
+            "res_model": jobs._name,
+            "target": "current",
+        }
+        if len(jobs) == 1:
+            action.update({"res_id": jobs.id, "view_mode": "form"})
+        else:
+            action.update(
+                {"domain": [("id", "in", jobs.ids)], "view_mode": "tree,form"}
+            )
+        return action
+
+    def action_view_statements(self):
+        self.ensure_one()
+        action = self.env["ir.actions.actions"]._for_xml_id(
+            "account.action_bank_statement_tree"
+        )
+        action["domain"] = [("id", "in", self.statement_ids.ids)]
+        return action
@@ -0,0 +1,87 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
+
+import gzip
+import logging
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+logger = logging.getLogger(__name__)
+
+
+class IrAttachment(models.Model):
+    _inherit = "ir.attachment"
+
+    statement_file_sha256 = fields.Char(
+        string="Statement File SHA-256",
+        index=True,
+        readonly=True,
+        help="SHA-256 of the content of an imported bank statement file, "
+        "used to detect that the same file is imported again.",
+    )
+    # Not copied: the copies of an attachment get its decompressed content
+    statement_file_compressed = fields.Boolean(
+        readonly=True,
+        copy=False,
+        help="The imported bank statement file is stored compressed with gzip. "
+        "It is decompressed when it is read, so that users still get "
+        "the original file.",
+    )
+
+    @api.depends("store_fname", "db_datas", "statement_file_compressed")
+    def _compute_raw(self):
+        super()._compute_raw()
+        for attach in self:
+            if attach.statement_file_compressed and attach.raw:
+                attach.raw = gzip.decompress(attach.raw)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        attachments = super().create(vals_list)
+        # The size of a compressed file is the size of the original file,
+        # which is the one downloaded by users
+        for attach in attachments.filtered("statement_file_compressed"):
+            attach.file_size = len(attach.raw)
+        return attachments
+
+    def write(self, vals):
+        # The new content is not compressed
+        if ("raw" in vals or "datas" in vals) and (
+            "statement_file_compressed" not in vals
+        ):
+            vals = dict(vals, statement_file_compressed=False)
+        return super().write(vals)
+
+    @api.model
+    def _gc_statement_files(self):
+        """Delete the imported bank statement files, and the files of the
+        failed imports, older than the number of days of the system parameter
+        'account_statement_import_file.file_retention_days' (0 or not set:
+        the files are kept forever)."""
+        retention_days = int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("account_statement_import_file.file_retention_days", 0)
+        )
+        if retention_days <= 0:
+            return
+        attachments = self.sudo().search(
+            [
+                "|",
+                "&",
+                ("statement_file_sha256", "!=", False),
+                ("res_model", "=", "account.bank.statement"),
+                ("res_model", "=", "account.statement.import.log"),
+                (
+                    "create_date",
+                    "<",
+                    fields.Datetime.now() - timedelta(days=retention_days),
+                ),
+            ]
+        )
+        logger.info(
+            "Deleting %d bank statement files older than %d days",
+            len(attachments),
+            retention_days,
+        )
+        attachments.unlink()
@@ -0,0 +1,29 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
+
+from odoo import models
+from odoo.http import Stream
+
+
+class IrBinary(models.AbstractModel):
+    _inherit = "ir.binary"
+
+    def _record_to_stream(self, record, field_name):
+        # Compressed statement files are stored on the filestore as gzip
+        # files: serve the original file instead of the stored one
+        if (
+            record._name == "ir.attachment"
+            and field_name in ("raw", "datas", "db_datas")
+            and record.statement_file_compressed
+        ):
+            data = record.raw
+            return Stream(
+                type="data",
+                data=data,
+                size=len(data),
+                mimetype=record.mimetype,
+                download_name=record.name,
+                conditional=True,
+                etag=record.checksum,
+                last_modified=record.write_date,
+            )
+        return super()._record_to_stream(record, field_name)
@@ -0,0 +1,4 @@
+from . import test_create_bank_statements
+from . import test_match_journal
+from . import test_import_log
+from . import test_import_file
@@ -0,0 +1,169 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
+
+import base64
+import json
+import logging
+import os
+import resource
+import threading
+import time
+
+import psutil
+
+from odoo.tests.common import TransactionCase
+
+_logger = logging.getLogger(__name__)
+
+# Number of lines of the synthetic files of the benchmarks, separated by commas.
+# Can be overridden by the environment variable of the same name,
+# for example STATEMENT_IMPORT_BENCHMARK_SIZES=1000,10000,100000
+STATEMENT_IMPORT_BENCHMARK_SIZES = "1000"
+# Interval of the samples of the resident memory of PeakRSSMeter (s)
+PEAK_RSS_SAMPLE_INTERVAL = 0.01
+
+
+class PeakRSSMeter:
+    """Context manager measuring the peak of the resident memory (RSS) of
+    the process while its block runs. Unlike tracemalloc, it includes the
+    memory allocated by the C libraries, such as libxml2.
+    The RSS is sampled by a thread every PEAK_RSS_SAMPLE_INTERVAL seconds.
+    When the block raises the maximum RSS of the process (getrusage()),
+    this exact maximum is used instead. The attributes 'start' and 'peak'
+    are the RSS at the start of the block and its peak, in bytes."""
+
+    def __enter__(self):
+        self._process = psutil.Process()
+        self._max_rss_start = self._get_max_rss()
+        self.start = self.peak = self._process.memory_info().rss
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._process.memory_info().rss)
+        max_rss = self._get_max_rss()
+        if max_rss > self._max_rss_start:
+            self.peak = max(self.peak, max_rss)
+
+    def _sample(self):
+        while not self._stop.wait(PEAK_RSS_SAMPLE_INTERVAL):
+            self.peak = max(self.peak, self._process.memory_info().rss)
+
+    @staticmethod
+    def _get_max_rss():
+        # ru_maxrss is in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    @property
+    def increase(self):
+        """Increase of the RSS of the process during the block, in bytes"""
+        return self.peak - self.start
+
+
+class StatementImportBenchmarkCase(TransactionCase):
+    """Common class of the benchmarks of the statement file formats.
+    Each format module generates synthetic files of the sizes given by
+    _get_benchmark_sizes() and imports them with _check_import_benchmark(),
+    in a test class tagged with "-standard" and "statement_import_benchmark",
+    so that the benchmarks only run with
+    --test-tags statement_import_benchmark"""
+
+    @classmethod
+    def _get_benchmark_sizes(cls):
+        sizes = os.environ.get(
+            "STATEMENT_IMPORT_BENCHMARK_SIZES", STATEMENT_IMPORT_BENCHMARK_SIZES
+        )
+        return [int(size) for size in sizes.split(",") if size.strip()]
+
+    @classmethod
+    def _create_benchmark_journal(cls, code, account_number=None, currency=None):
+        vals = {
+            "name": "Bank Journal - (benchmark %s)" % code,
+            "code": code,
+            "type": "bank",
+        }
+        if account_number:
+            vals["bank_account_id"] = (
+                cls.env["res.partner.bank"]
+                .create(
+                    {
+                        "acc_number": account_number,
+                        "partner_id": cls.env.company.partner_id.id,
+                        "company_id": cls.env.company.id,
+                    }
+                )
+                .id
+            )
+        if currency:
+            vals["currency_id"] = currency.id
+        return cls.env["account.journal"].create(vals)
+
+    def _run_import_benchmark(
+        self, file_format, file_data, filename, journal=None, wizard_vals=None
+    ):
+        """Import file_data with the import wizard and return the measures:
+        - 'parse': time spent in the parsing of the file (s)
+        - 'total': total time of the import (s)
+        - 'peak_rss': increase of the peak of the resident memory of the
+          process during the import, C libraries included (bytes)
+        - 'queries': number of SQL queries
+        - 'lines_created': number of statement lines created"""
+        vals = {
+            "statement_filename": filename,
+            "statement_file": base64.b64encode(file_data),
+        }
+        vals.update(wizard_vals or {})
+        wizard = (
+            self.env["account.statement.import"]
+            .with_context(
+                journal_id=journal and journal.id,
+                statement_import_skip_file_check=True,
+            )
+            .create(vals)
+        )
+        self.env.flush_all()
+        queries_start = self.env.cr.sql_log_count
+        with PeakRSSMeter() as meter:
+            time_start = time.perf_counter()
+            wizard._import_file()
+            self.env.flush_all()
+            total = time.perf_counter() - time_start
+        queries = self.env.cr.sql_log_count - queries_start
+        log = self.env["account.statement.import.log"].search(
+            [("file_sha256", "=", wizard._get_file_sha256(file_data))], limit=1
+        )
+        stats = json.loads(log.stats)
+        measures = {
+            "parse": stats["phases"].get("parse", {}).get("duration", 0.0),
+            "total": total,
+            "peak_rss": meter.increase,
+            "queries": queries,
+            "lines_created": log.lines_created,
+        }
+        _logger.info(
+            "Benchmark of the import of a %s file of %d bytes: "
+            "%d lines created, parse %.3fs, total %.3fs, "
+            "peak RSS +%.1f MiB, %d queries",
+            file_format,
+            len(file_data),
+            measures["lines_created"],
+            measures["parse"],
+            measures["total"],
+            meter.increase / 1024 / 1024,
+            queries,
+        )
+        return measures
+
+    def _check_import_benchmark(self, file_format, generate_file, filename, **kwargs):
+        """Run the benchmark of the format on a file of each size.
+        generate_file(nb_lines) must return a synthetic file of nb_lines
+        transactions, which are all imported."""
+        for nb_lines in self._get_benchmark_sizes():
+            with self.subTest(file_format=file_format, nb_lines=nb_lines):
+                measures = self._run_import_benchmark(
+                    file_format, generate_file(nb_lines), filename, **kwargs
+                )
+                self.assertEqual(measures["lines_created"], nb_lines)
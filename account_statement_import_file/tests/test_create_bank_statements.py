@@ -0,0 +1,424 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
+
+import base64
+import logging
+import time
+import tracemalloc
+import zlib
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+_logger = logging.getLogger(__name__)
+
+
+class TestCreateBankStatementsCommon(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.journal = cls.env["account.journal"].create(
+            {
+                "name": "Bank Journal - (test import)",
+                "code": "TBNKIMP",
+                "type": "bank",
+            }
+        )
+        cls.wizard = cls.env["account.statement.import"].create(
+            {
+                "statement_filename": "test import",
+                "statement_file": base64.b64encode(b"test import"),
+            }
+        )
+
+    def _get_st_vals(self, prefix, st_index, nb_lines):
+        """Return the values of a synthetic statement, as they
+        are after _complete_stmts_vals()"""
+        st_date = date(2024, 1, 1) + timedelta(days=st_index)
+        transactions = [
+            {
+                "journal_id": self.journal.id,
+                "date": st_date,
+                "payment_ref": "Transaction %d/%d" % (st_index, line_index),
+                "amount": 10.0,
+                "unique_import_id": "%s-%d-%d" % (prefix, st_index, line_index),
+            }
+            for line_index in range(nb_lines)
+        ]
+        return {
+            "journal_id": self.journal.id,
+            "name": "%s/%d" % (prefix, st_index),
+            "date": st_date,
+            "balance_start": 0.0,
+            "balance_end_real": 10.0 * nb_lines,
+            "transactions": transactions,
+        }
+
+    def _get_stmts_vals(self, prefix, nb_statements, nb_lines):
+        """Return the values of a synthetic multi-statement file"""
+        return [
+            self._get_st_vals(prefix, st_index, nb_lines)
+            for st_index in range(nb_statements)
+        ]
+
+    def _iter_stmts_vals(self, prefix, nb_statements, nb_lines):
+        """Yield the statements of a synthetic multi-statement file
+        one by one, like a streaming parser"""
+        for st_index in range(nb_statements):
+            yield self._get_st_vals(prefix, st_index, nb_lines)
+
+    def _import_single_statement(self, stmts_vals):
+        result = {"statement_ids": [], "notifications": []}
+        self.wizard.with_context(journal_id=self.journal.id).import_single_statement(
+            (self.env.company.currency_id.name, None, stmts_vals), result
+        )
+        return result
+
+    def _create_bank_statements(self, stmts_vals):
+        result = {"statement_ids": [], "notifications": []}
+        self.wizard._create_bank_statements(stmts_vals, result)
+        return result
+
+
+class TestCreateBankStatements(TestCreateBankStatementsCommon):
+    def _check_statements(self, result, prefix, nb_statements, nb_lines):
+        statements = self.env["account.bank.statement"].browse(result["statement_ids"])
+        self.assertEqual(
+            statements.mapped("name"),
+            ["%s/%d" % (prefix, st_index) for st_index in range(nb_statements)],
+        )
+        for statement in statements:
+            self.assertEqual(
+                statement.line_ids.sorted("sequence").mapped("sequence"),
+                list(range(1, nb_lines + 1)),
+            )
+
+    def test_create_bank_statements(self):
+        result = self._create_bank_statements(self._get_stmts_vals("BATCH", 3, 4))
+        self._check_statements(result, "BATCH", 3, 4)
+        self.assertFalse(result["notifications"])
+
+    def test_create_bank_statements_duplicates(self):
+        self._create_bank_statements(self._get_stmts_vals("DUP", 2, 3))
+        stmts_vals = self._get_stmts_vals("DUP", 3, 3)
+        result = self._create_bank_statements(stmts_vals)
+        self.assertEqual(len(result["statement_ids"]), 1)
+        self.assertEqual(
+            result["notifications"],
+            ["6 transactions had already been imported and were ignored."],
+        )
+        # balance_start is shifted by the amount of the ignored transactions
+        self.assertEqual(stmts_vals[0]["balance_start"], 30.0)
+        self.assertEqual(stmts_vals[2]["balance_start"], 0.0)
+
+    def test_create_bank_statements_duplicates_balances(self):
+        """The statements created together keep their balances when some
+        of their lines are skipped as duplicates"""
+        self._create_bank_statements(self._get_stmts_vals("DUPBAL", 2, 2))
+        result = self._create_bank_statements(self._get_stmts_vals("DUPBAL", 3, 4))
+        statements = self.env["account.bank.statement"].browse(result["statement_ids"])
+        self.assertEqual(
+            statements.mapped("name"), ["DUPBAL/0", "DUPBAL/1", "DUPBAL/2"]
+        )
+        self.assertEqual([len(st.line_ids) for st in statements], [2, 2, 4])
+        self.assertEqual(statements.mapped("balance_start"), [20.0, 20.0, 0.0])
+        self.assertEqual(statements.mapped("balance_end_real"), [40.0, 40.0, 40.0])
+        self.assertEqual(statements.mapped("balance_end"), [40.0, 40.0, 40.0])
+        self.assertTrue(all(statements.mapped("is_complete")))
+
+    def test_create_bank_statements_duplicates_same_statement(self):
+        """A transaction twice in a statement is an error, while a
+        transaction of a previous statement of the file is skipped"""
+        stmts_vals = self._get_stmts_vals("DUPST", 2, 2)
+        stmts_vals[1]["transactions"][1]["unique_import_id"] = "DUPST-0-0"
+        result = self._create_bank_statements(stmts_vals)
+        statements = self.env["account.bank.statement"].browse(result["statement_ids"])
+        self.assertEqual([len(st.line_ids) for st in statements], [2, 1])
+        stmts_vals = self._get_stmts_vals("DUPST2", 1, 3)
+        stmts_vals[0]["transactions"][2]["unique_import_id"] = "DUPST2-0-0"
+        with self.assertRaisesRegex(UserError, "DUPST2-0-0"):
+            self._create_bank_statements(stmts_vals)
+
+    def test_import_stats(self):
+        stats = self.wizard._new_import_stats()
+        wizard = self.wizard.with_context(statement_import_stats=stats)
+        result = {"statement_ids": [], "notifications": []}
+        wizard._create_bank_statements(self._get_stmts_vals("STATS", 2, 3), result)
+        wizard._create_bank_statements(self._get_stmts_vals("STATS", 3, 3), result)
+        self.assertEqual(
+            stats["counters"],
+            {"statements_created": 3, "lines_created": 9, "duplicates_skipped": 6},
+        )
+        self.assertEqual(set(stats["phases"]), {"duplicates", "create"})
+        self.assertGreater(stats["phases"]["create"]["queries"], 0)
+
+    def test_unique_import_hash(self):
+        result = self._create_bank_statements(self._get_stmts_vals("HASH", 1, 2))
+        line = (
+            self.env["account.bank.statement"]
+            .browse(result["statement_ids"])
+            .line_ids.filtered(lambda line: line.unique_import_id == "HASH-0-0")
+        )
+        self.assertEqual(len(line.unique_import_hash), 32)
+        absl_obj = self.env["account.bank.statement.line"]
+        self.assertEqual(
+            line.unique_import_hash, absl_obj._get_unique_import_hash("HASH-0-0")
+        )
+        self.assertEqual(
+            absl_obj._get_imported_unique_import_ids({"HASH-0-0", "HASH-0-9"}),
+            {"HASH-0-0": line.id},
+        )
+
+    def test_match_currency_journal_cache(self):
+        self.journal.bank_account_id = self.env["res.partner.bank"].create(
+            {
+                "acc_number": "FR76 3000 4000 0312 3456 7890 143",
+                "partner_id": self.env.company.partner_id.id,
+            }
+        )
+        wizard = self.wizard.with_context(statement_import_cache={})
+        currency_code = self.env.company.currency_id.name
+        currency = wizard._match_currency(currency_code)
+        journal = wizard._match_journal("FR7630004000031234567890143", currency)
+        self.assertEqual(journal, self.journal)
+        self.env.flush_all()
+        with self.assertQueryCount(0):
+            self.assertEqual(wizard._match_currency(currency_code), currency)
+            self.assertEqual(
+                wizard._match_journal("FR7630004000031234567890143", currency),
+                journal,
+            )
+
+    def test_statement_line_import_speeddict(self):
+        partner_bank = self.env["res.partner.bank"].create(
+            {
+                "acc_number": "BE68 5390 0754 7034",
+                "partner_id": self.env.ref("base.res_partner_2").id,
+            }
+        )
+        lines_vals = [{"account_number": "be68 5390 0754 7034"}, {"amount": 1.0}]
+        account_numbers = self.journal._statement_line_import_account_numbers(
+            lines_vals
+        )
+        self.assertEqual(account_numbers, {"BE68539007547034"})
+        speeddict = self.journal.with_context(
+            statement_line_import_account_numbers=account_numbers
+        )._statement_line_import_speeddict()
+        self.assertEqual(
+            speeddict["account_number"],
+            {
+                "BE68539007547034": {
+                    "partner_id": partner_bank.partner_id.id,
+                    "partner_bank_id": partner_bank.id,
+                }
+            },
+        )
+        # No query when the file doesn't contain any account number
+        self.env.flush_all()
+        with self.assertQueryCount(0):
+            speeddict = self.journal.with_context(
+                statement_line_import_account_numbers=set()
+            )._statement_line_import_speeddict()
+        self.assertEqual(speeddict, {"account_number": {}})
+        # The numbers are cached by the process: only the stamp of the bank
+        # accounts is read
+        journal = self.journal.with_context(
+            statement_line_import_account_numbers=account_numbers
+        )
+        journal._statement_line_import_speeddict()
+        with self.assertQueryCount(1):
+            speeddict = journal._statement_line_import_speeddict()
+        self.assertEqual(list(speeddict["account_number"]), ["BE68539007547034"])
+        # The stamp changes when the bank accounts are modified
+        partner_bank.acc_number = "BE71 0961 2345 6769"
+        speeddict = self.journal.with_context(
+            statement_line_import_account_numbers={
+                "BE68539007547034",
+                "BE71096123456769",
+            }
+        )._statement_line_import_speeddict()
+        self.assertEqual(
+            list(speeddict["account_number"]),
+            ["BE71096123456769"],
+        )
+
+    def test_statement_line_import_speeddict_maps(self):
+        partner = self.env["res.partner"].create(
+            {"name": "Statement  Import Partner", "ref": "SIP-0001"}
+        )
+        speeddict = self.journal._statement_line_import_speeddict()
+        self.assertNotIn("partner_name", speeddict)
+        self.assertNotIn("partner_ref", speeddict)
+        speeddict = self.journal.with_context(
+            statement_line_import_account_numbers=set(),
+            statement_line_import_speeddict_maps={
+                "partner_name": {"Statement  Import Partner", "Unknown Partner"},
+                "partner_ref": {"SIP-0001"},
+            },
+        )._statement_line_import_speeddict()
+        normalized_name = self.journal._statement_line_import_normalize_partner_name(
+            "statement import PARTNER "
+        )
+        # Only the partners with the given names and references are read
+        self.assertEqual(speeddict["partner_name"], {normalized_name: partner.id})
+        self.assertEqual(speeddict["partner_ref"], {"SIP-0001": partner.id})
+
+    def test_statement_lines_import_update(self):
+        partner_bank = self.env["res.partner.bank"].create(
+            {
+                "acc_number": "BE68 5390 0754 7034",
+                "partner_id": self.env.ref("base.res_partner_2").id,
+            }
+        )
+        speeddict = self.journal._statement_line_import_speeddict()
+
+        def get_lines_vals():
+            return [
+                {"unique_import_id": "1", "account_number": "be68 5390 0754 7034"},
+                {"unique_import_id": "2", "account_number": "BE68539007547034"},
+                {"unique_import_id": "3", "account_number": "FR76 3000 4000 0312"},
+                {"unique_import_id": "4", "partner_id": partner_bank.partner_id.id},
+                {"payment_ref": "no unique import id"},
+            ]
+
+        lines_vals = get_lines_vals()
+        self.journal._statement_lines_import_update(
+            lines_vals, "BE71 0961 2345 6769", speeddict
+        )
+        expected_lines_vals = get_lines_vals()
+        for st_line_vals in expected_lines_vals:
+            self.journal._statement_line_import_update_unique_import_id(
+                st_line_vals, "BE71 0961 2345 6769"
+            )
+            self.journal._statement_line_import_update_hook(st_line_vals, speeddict)
+        self.assertEqual(lines_vals, expected_lines_vals)
+        self.assertEqual(
+            lines_vals[0]["unique_import_id"],
+            "BE71096123456769-%d-1" % self.journal.id,
+        )
+        self.assertEqual(lines_vals[1]["partner_bank_id"], partner_bank.id)
+
+    def test_raw_data(self):
+        stmts_vals = self._get_stmts_vals("RAW", 2, 1)
+        raw_data = '{"transaction": "%s"}' % ("x" * 1000)
+        for st_vals in stmts_vals:
+            st_vals["transactions"][0]["raw_data"] = raw_data
+        stmts_vals[0]["date"] = date(2020, 1, 1)
+        stmts_vals[0]["transactions"][0]["date"] = date(2020, 1, 1)
+        result = self._create_bank_statements(stmts_vals)
+        lines = (
+            self.env["account.bank.statement"]
+            .browse(result["statement_ids"])
+            .line_ids.sorted("date")
+        )
+        self.assertEqual(lines.mapped("raw_data"), [raw_data, raw_data])
+        # Stored as raw zlib bytes, not encoded in base64
+        self.env.cr.execute(
+            """
+            SELECT octet_length(raw_data_compressed)
+            FROM account_bank_statement_line WHERE id = %s
+            """,
+            (lines[0].id,),
+        )
+        self.assertEqual(
+            self.env.cr.fetchone()[0], len(zlib.compress(raw_data.encode("utf-8")))
+        )
+        lines.invalidate_recordset()
+        self.assertEqual(
+            lines.with_context(bin_size=True).mapped("raw_data"),
+            [raw_data, raw_data],
+        )
+        self.env["ir.config_parameter"].sudo().set_param(
+            "account_statement_import_base.raw_data_retention_months", 12
+        )
+        lines._gc_raw_data()
+        self.assertFalse(lines[0].raw_data)
+        self.assertEqual(lines[1].raw_data, raw_data)
+        line_model = self.env["account.bank.statement.line"]
+        self.assertEqual(
+            line_model.search([("id", "in", lines.ids), ("raw_data", "!=", False)]),
+            lines[1],
+        )
+        self.assertEqual(
+            line_model.search([("id", "in", lines.ids), ("raw_data", "=", False)]),
+            lines[0],
+        )
+        with self.assertRaises(UserError):
+            line_model.search([("raw_data", "ilike", "transaction")])
+
+    def test_import_single_statement_stream(self):
+        # More statements than STATEMENT_IMPORT_CHUNK_SIZE
+        result = self._import_single_statement(self._iter_stmts_vals("STREAM", 150, 2))
+        self._check_statements(result, "STREAM", 150, 2)
+        self.assertEqual(self.journal.bank_statements_source, "file_import_oca")
+
+
+@tagged("-standard", "statement_import_benchmark")
+class TestCreateBankStatementsBenchmark(TestCreateBankStatementsCommon):
+    """Compare the batched creation of the statements with their creation
+    one by one, as it was done before, on a synthetic file of 500 statements.
+    Run with --test-tags statement_import_benchmark"""
+
+    def _create_bank_statement_records_one_by_one(self, st_vals_list):
+        statements = self.env["account.bank.statement"]
+        for st_vals in st_vals_list:
+            statements |= statements.create(st_vals)
+        return statements
+
+    def _run_benchmark(self, prefix, one_by_one):
+        stmts_vals = self._get_stmts_vals(prefix, 500, 5)
+        self.env.flush_all()
+        queries_start = self.env.cr.sql_log_count
+        time_start = time.perf_counter()
+        if one_by_one:
+            with patch.object(
+                type(self.wizard),
+                "_create_bank_statement_records",
+                side_effect=self._create_bank_statement_records_one_by_one,
+            ):
+                result = self._create_bank_statements(stmts_vals)
+        else:
+            result = self._create_bank_statements(stmts_vals)
+        self.env.flush_all()
+        duration = time.perf_counter() - time_start
+        queries = self.env.cr.sql_log_count - queries_start
+        _logger.info(
+            "Creation of 500 statements (%s): %.2fs, %d queries",
+            one_by_one and "one by one" or "batched",
+            duration,
+            queries,
+        )
+        return result, duration, queries
+
+    def test_benchmark_create_bank_statements(self):
+        result_single, __, queries_single = self._run_benchmark("BENCH1", True)
+        result_batch, __, queries_batch = self._run_benchmark("BENCH2", False)
+        self.assertEqual(len(result_single["statement_ids"]), 500)
+        self.assertEqual(len(result_batch["statement_ids"]), 500)
+        self.assertLess(queries_batch, queries_single)
+
+    def _run_memory_benchmark(self, prefix, stmts_vals):
+        tracemalloc.start()
+        try:
+            result = self._import_single_statement(stmts_vals(prefix))
+            __, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        _logger.info(
+            "Import of %d statements (%s): peak memory %.1f MiB",
+            len(result["statement_ids"]),
+            prefix,
+            peak / 1024 / 1024,
+        )
+        return peak
+
+    def test_benchmark_import_single_statement_stream(self):
+        peak_list = self._run_memory_benchmark(
+            "BENCHLIST", lambda prefix: self._get_stmts_vals(prefix, 1000, 5)
+        )
+        peak_stream = self._run_memory_benchmark(
+            "BENCHSTREAM", lambda prefix: self._iter_stmts_vals(prefix, 1000, 5)
+        )
+        self.assertLess(peak_stream, peak_list)
@@ -0,0 +1,193 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
+
+import base64
+from datetime import date
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.exceptions import UserError
+from odoo.tests.common import TransactionCase
+
+
+def _parse_stub_file(wizard, data_file):
+    """Minimal parser of the files of these tests, with one transaction
+    per line: 'statement name;date;amount;unique import ID'"""
+    stmts_vals = {}
+    for line in data_file.decode("utf-8").splitlines():
+        name, line_date, amount, unique_import_id = line.split(";")
+        line_date = fields.Date.to_date(line_date)
+        st_vals = stmts_vals.setdefault(
+            name, {"name": name, "date": line_date, "transactions": []}
+        )
+        st_vals["transactions"].append(
+            {
+                "date": line_date,
+                "payment_ref": "Transaction %s" % unique_import_id,
+                "amount": float(amount),
+                "unique_import_id": unique_import_id,
+            }
+        )
+    return wizard.env.company.currency_id.name, None, list(stmts_vals.values())
+
+
+class TestImportFile(TransactionCase):
+    """Tests of the import of files which don't depend on their format,
+    with the minimal parser _parse_stub_file()"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.journal = cls.env["account.journal"].create(
+            {
+                "name": "Bank Journal - (test import file)",
+                "code": "TBNKFILE",
+                "type": "bank",
+            }
+        )
+        cls.wizard_obj = cls.env["account.statement.import"].with_context(
+            journal_id=cls.journal.id
+        )
+
+    def setUp(self):
+        super().setUp()
+        patcher = patch.object(
+            type(self.wizard_obj), "_detect_and_parse_file", _parse_stub_file
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _get_file_data(self, *statement_names, nb_lines=20):
+        return "\n".join(
+            "%s;2024-01-05;10.0;%s-%d" % (name, name, index)
+            for name in statement_names
+            for index in range(nb_lines)
+        ).encode("utf-8")
+
+    def _create_wizard(self, file_data, filename="statement.txt"):
+        return self.wizard_obj.create(
+            {
+                "statement_filename": filename,
+                "statement_file": base64.b64encode(file_data),
+            }
+        )
+
+    def test_statement_import_background(self):
+        """Test import of a statement through an import job."""
+        action = self._create_wizard(
+            self._get_file_data("STUB/1")
+        ).import_file_background_button()
+        job = self.env["account.statement.import.job"].browse(action["res_id"])
+        self.assertEqual(job.state, "pending")
+        self.assertEqual(job.journal_id, self.journal)
+        self.assertTrue(job.attachment_id)
+        job._process()
+        self.assertEqual(job.state, "done", job.error)
+        self.assertFalse(job.attachment_id)
+        self.assertEqual(job.statement_count, 1)
+        self.assertEqual(job.statement_ids.name, "STUB/1")
+        self.assertEqual(len(job.statement_ids.line_ids), 20)
+
+    def test_statement_import_background_interrupted(self):
+        """Test that an interrupted import job is set as failed, that
+        the statements it had committed are deleted, and that it can
+        be retried."""
+        action = self._create_wizard(
+            self._get_file_data("STUB/1")
+        ).import_file_background_button()
+        job = self.env["account.statement.import.job"].browse(action["res_id"])
+        partial_statement = self.env["account.bank.statement"].create(
+            {
+                "name": "Partial import",
+                "line_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "journal_id": self.journal.id,
+                            "date": date(2024, 1, 5),
+                            "payment_ref": "Partial import",
+                            "amount": 10.0,
+                        },
+                    )
+                ],
+            }
+        )
+        # The process importing the job died after a commit
+        job.write(
+            {
+                "state": "running",
+                "statement_ids": [(6, 0, partial_statement.ids)],
+                "statement_count": 1,
+            }
+        )
+        job._cron_process_jobs()
+        self.assertEqual(job.state, "failed")
+        self.assertFalse(partial_statement.exists())
+        self.assertFalse(job.statement_ids)
+        self.assertEqual(job.statement_count, 0)
+        job.action_retry()
+        self.assertEqual(job.state, "pending")
+        job._process()
+        self.assertEqual(job.state, "done", job.error)
+        self.assertEqual(job.statement_ids.name, "STUB/1")
+
+    def test_multi_file_import(self):
+        """Test import of several files in one wizard run."""
+        attachments = self.env["ir.attachment"]
+        for filename, statement_names in (
+            ("statement-1.txt", ["STUB/1"]),
+            ("statement-2.txt", ["STUB/2", "STUB/3"]),
+        ):
+            attachments |= self.env["ir.attachment"].create(
+                {"name": filename, "raw": self._get_file_data(*statement_names)}
+            )
+        result = self.wizard_obj.create(
+            {"statement_file_ids": [(6, 0, attachments.ids)]}
+        )._import_file()
+        statements = self.env["account.bank.statement"].browse(result["statement_ids"])
+        self.assertEqual(statements.mapped("name"), ["STUB/1", "STUB/2", "STUB/3"])
+        # Each file is attached to the first statement created from it
+        attached_files = self.env["ir.attachment"].search(
+            [
+                ("res_model", "=", "account.bank.statement"),
+                ("res_id", "in", statements.ids),
+            ]
+        )
+        self.assertEqual(
+            sorted(attached_files.mapped(lambda att: (att.name, att.res_id))),
+            [
+                ("statement-1.txt", statements[0].id),
+                ("statement-2.txt", statements[1].id),
+            ],
+        )
+
+    def test_statement_import_same_file(self):
+        """Test that the same file can't be imported twice."""
+        file_data = self._get_file_data("STUB/1")
+        self._create_wizard(file_data).import_file_button()
+        wizard = self._create_wizard(file_data, filename="statement-again.txt")
+        with self.assertRaisesRegex(UserError, "already been imported"):
+            wizard.import_file_button()
+
+    def test_statement_import_compressed_file(self):
+        """Test that the imported file can be stored compressed."""
+        self.env["ir.config_parameter"].sudo().set_param(
+            "account_statement_import_file.compress_files", "1"
+        )
+        data = self._get_file_data("STUB/1")
+        result = self._create_wizard(data)._import_file()
+        attachment = self.env["ir.attachment"].search(
+            [
+                ("res_model", "=", "account.bank.statement"),
+                ("res_id", "=", result["statement_ids"][0]),
+            ]
+        )
+        self.assertTrue(attachment.statement_file_compressed)
+        self.assertLess(len(attachment._file_read(attachment.store_fname)), len(data))
+        self.assertEqual(attachment.file_size, len(data))
+        self.assertEqual(attachment.raw, data)
+        self.assertEqual(base64.b64decode(attachment.datas), data)
+        # The copies are not compressed
+        attachment_copy = attachment.copy()
+        self.assertFalse(attachment_copy.statement_file_compressed)
+        self.assertEqual(attachment_copy.raw, data)
@@ -0,0 +1,106 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
+
+import base64
+from datetime import date
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests.common import TransactionCase
+
+
+class TestImportLog(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.journal = cls.env["account.journal"].create(
+            {
+                "name": "Bank Journal - (test import log)",
+                "code": "TBNKLOG",
+                "type": "bank",
+            }
+        )
+        cls.wizard = (
+            cls.env["account.statement.import"]
+            .with_context(journal_id=cls.journal.id)
+            .create(
+                {
+                    "statement_filename": "statement.txt",
+                    "statement_file": base64.b64encode(b"test import log"),
+                }
+            )
+        )
+        cls.log_obj = cls.env["account.statement.import.log"]
+
+    def _get_parsing_data(self):
+        return (
+            self.env.company.currency_id.name,
+            None,
+            [
+                {
+                    "name": "LOG/1",
+                    "date": date(2024, 1, 1),
+                    "transactions": [
+                        {
+                            "date": date(2024, 1, 1),
+                            "payment_ref": "Transaction %d" % index,
+                            "amount": 10.0,
+                            "unique_import_id": "LOG-%d" % index,
+                        }
+                        for index in range(3)
+                    ],
+                }
+            ],
+        )
+
+    def test_import_log(self):
+        with patch.object(
+            type(self.wizard),
+            "_detect_and_parse_file",
+            return_value=self._get_parsing_data(),
+        ):
+            result = self.wizard._import_file()
+        log = self.log_obj.search([("name", "=", "statement.txt")])
+        self.assertEqual(log.state, "done")
+        self.assertEqual(log.journal_id, self.journal)
+        self.assertEqual(log.statement_ids.ids, result["statement_ids"])
+        self.assertEqual(log.lines_parsed, 3)
+        self.assertEqual(log.lines_created, 3)
+        self.assertEqual(log.duplicates_skipped, 0)
+        self.assertEqual(log.attachment_id.res_model, "account.bank.statement")
+        self.assertEqual(
+            log.file_sha256, self.wizard._get_file_sha256(b"test import log")
+        )
+        self.assertGreater(log.query_count, 0)
+
+    def test_import_log_failed_replay(self):
+        # No parser is installed for this file. Not in assertRaises(), whose
+        # savepoint would roll back the log committed by the test cursor.
+        try:
+            self.wizard._import_file()
+        except UserError as e:
+            error = e.args[0]
+        else:
+            self.fail("The import of the file should fail")
+        self.assertIn("not supported", error)
+        log = self.log_obj.search([("name", "=", "statement.txt")])
+        self.assertEqual(log.state, "failed")
+        self.assertIn("not supported", log.error)
+        self.assertEqual(log.attachment_id.raw, b"test import log")
+        action = log.action_replay()
+        job = self.env["account.statement.import.job"].browse(action["res_id"])
+        self.assertEqual(job.state, "pending")
+        self.assertEqual(job.journal_id, self.journal)
+        self.assertEqual(job.attachment_id.raw, b"test import log")
+        # The file of the log is deleted with the other imported files
+        attachment = log.attachment_id
+        self.env.cr.execute(
+            "UPDATE ir_attachment SET create_date = %s WHERE id = %s",
+            (date(2024, 1, 1), attachment.id),
+        )
+        self.env["ir.config_parameter"].sudo().set_param(
+            "account_statement_import_file.file_retention_days", 30
+        )
+        self.env["ir.attachment"].invalidate_model(["create_date"])
+        self.env["ir.attachment"]._gc_statement_files()
+        self.assertFalse(attachment.exists())
+        self.assertTrue(job.attachment_id.exists())
@@ -2,35 +2,65 @@
 # Licence LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0).
 
 import base64
+import gzip
+import hashlib
+import json
 import logging
+import time
+from contextlib import contextmanager
 
-from odoo import _, api, fields, models
+from odoo import _, api, fields, models, release
 from odoo.exceptions import UserError
+from odoo.tools import format_date
+from odoo.tools.mimetypes import guess_mimetype
 
 from odoo.addons.base.models.res_bank import sanitize_account_number
 
 logger = logging.getLogger(__name__)
 
+# Number of bytes given to the format detection methods
+STATEMENT_FILE_HEAD_SIZE = 4096
+# Number of bank statements created at once by streaming parsers
+STATEMENT_IMPORT_CHUNK_SIZE = 100
+# Maximum number of transactions of a chunk of bank statements
+STATEMENT_IMPORT_CHUNK_LINES = 5000
+# Files starting with these bytes are already compressed (zip, gzip, bzip2, 7z)
+COMPRESSED_FILE_MAGICS = (b"PK\x03\x04", b"\x1f\x8b", b"BZh", b"7z\xbc\xaf")
+
 
 class AccountStatementImport(models.TransientModel):
     _name = "account.statement.import"
     _description = "Import Bank Statement Files"
 
     statement_file = fields.Binary(
-        required=True,
         help="Download bank statement files from your bank and upload them here.",
     )
     statement_filename = fields.Char()
+    statement_file_ids = fields.Many2many(
+        "ir.attachment",
+        string="Statement Files",
+        help="Upload several bank statement files here to import them " "all at once.",
+    )
 
     def _import_file(self):
         self.ensure_one()
+        if self.statement_file_ids:
+            return self._import_files()
+        if not self.statement_file:
+            raise UserError(_("You must select a bank statement file to import."))
         result = {
             "statement_ids": [],
             "notifications": [],  # list of text messages
         }
         logger.info("Start to import bank statement file %s", self.statement_filename)
+        stats = self._new_import_stats()
+        wizard = self.with_context(statement_import_stats=stats)
         file_data = base64.b64decode(self.statement_file)
-        self.import_single_file(file_data, result)
+        with wizard._import_phase("file_check"):
+            already_imported_msg = wizard._check_file_already_imported(file_data)
+        if already_imported_msg:
+            raise UserError(already_imported_msg)
+        wizard._import_and_log_file(file_data, result)
         logger.debug("result=%s", result)
         if not result["statement_ids"]:
             raise UserError(
@@ -39,9 +69,157 @@ class AccountStatementImport(models.TransientModel):
                     "only contains already imported transactions."
                 )
             )
-        self.env["ir.attachment"].create(self._prepare_create_attachment(result))
         return result
 
+    def _get_file_wizards(self):
+        """Return one wizard per file to import, each one having the file
+        in statement_file and the other values of this wizard, so that the
+        format-specific code can keep reading the wizard fields."""
+        self.ensure_one()
+        files = [(att.name, att.datas) for att in self.statement_file_ids]
+        if self.statement_file:
+            files.insert(0, (self.statement_filename, self.statement_file))
+        wizards = self.browse()
+        for filename, file in files:
+            wizards |= self.copy(
+                {
+                    "statement_file": file,
+                    "statement_filename": filename,
+                    "statement_file_ids": [(5, 0, 0)],
+                }
+            )
+        return wizards
+
+    def _import_files(self):
+        """Import several files one after the other and return the result
+        of all the files. Files which only contain already imported
+        transactions are reported in the notifications instead of
+        blocking the import of the other files."""
+        result = {
+            "statement_ids": [],
+            "notifications": [],
+        }
+        wizards = self._get_file_wizards()
+        logger.info("Start to import %d bank statement files", len(wizards))
+        for wizard in wizards:
+            file_result = {
+                "statement_ids": [],
+                "notifications": [],
+            }
+            logger.info(
+                "Start to import bank statement file %s", wizard.statement_filename
+            )
+            stats = self._new_import_stats()
+            wizard = wizard.with_context(statement_import_stats=stats)
+            file_data = base64.b64decode(wizard.statement_file)
+            with wizard._import_phase("file_check"):
+                already_imported_msg = wizard._check_file_already_imported(file_data)
+            if already_imported_msg:
+                result["notifications"].append(
+                    "%s: %s" % (wizard.statement_filename, already_imported_msg)
+                )
+                continue
+            try:
+                wizard._import_and_log_file(file_data, file_result)
+            except UserError as e:
+                raise UserError(
+                    _(
+                        "Error while importing the file %(filename)s:\n%(error)s",
+                        filename=wizard.statement_filename,
+                        error=e.args[0],
+                    )
+                ) from e
+            if not file_result["statement_ids"]:
+                file_result["notifications"].append(
+                    _(
+                        "You have already imported this file, or this file "
+                        "only contains already imported transactions."
+                    )
+                )
+            result["statement_ids"].extend(file_result["statement_ids"])
+            result["notifications"].extend(
+                "%s: %s" % (wizard.statement_filename, msg)
+                for msg in file_result["notifications"]
+            )
+        logger.debug("result=%s", result)
+        if not result["statement_ids"]:
+            raise UserError(
+                _(
+                    "You have already imported these files, or these files "
+                    "only contain already imported transactions."
+                )
+            )
+        return result
+
+    def _import_and_log_file(self, file_data, result):
+        """Import the file with import_single_file(), attach it to the first
+        bank statement and create the import log of the file, with the
+        statistics of the context key 'statement_import_stats'.
+        If the import fails, the log is created anyway, with the file
+        attached to it, so that the import can be replayed."""
+        stats = self.env.context["statement_import_stats"]
+        # Prepared before the import, which can abort the transaction
+        log_vals = self._prepare_import_log_vals(file_data)
+        try:
+            self.import_single_file(file_data, result)
+            attachment = self.env["ir.attachment"]
+            if result["statement_ids"]:
+                with self._import_phase("attachment"):
+                    attachment = attachment.create(
+                        self._prepare_create_attachment(result)
+                    )
+        except Exception as e:
+            log_vals.update(self._prepare_import_log_stats_vals(stats, result))
+            log_vals.update(
+                {
+                    "state": "failed",
+                    "statement_ids": [],
+                    "statement_count": 0,
+                    "error": e.args[0] if isinstance(e, UserError) else str(e),
+                }
+            )
+            self.env["account.statement.import.log"]._create_failed_log(
+                log_vals, file_data
+            )
+            raise
+        self._log_import_stats(stats)
+        log_vals.update(self._prepare_import_log_stats_vals(stats, result))
+        log_vals.update({"state": "done", "attachment_id": attachment.id})
+        if result["statement_ids"]:
+            log_vals["journal_id"] = (
+                self.env["account.bank.statement"]
+                .browse(result["statement_ids"][0])
+                .journal_id.id
+            )
+        self.env["account.statement.import.log"].sudo().create(log_vals)
+
+    def _prepare_import_log_vals(self, file_data):
+        return {
+            "name": self.statement_filename or _("Bank Statement File"),
+            "company_id": self.env.company.id,
+            "journal_id": self.env.context.get("journal_id"),
+            "job_id": self.env.context.get("statement_import_job_id"),
+            "file_sha256": self._get_file_sha256(file_data),
+            "wizard_values": self._prepare_import_job_vals()["wizard_values"],
+            "server_version": release.version,
+        }
+
+    @api.model
+    def _prepare_import_log_stats_vals(self, stats, result):
+        counters = stats["counters"]
+        return {
+            "file_format": stats.get("file_format"),
+            "statement_ids": [(6, 0, result["statement_ids"])],
+            "statement_count": len(result["statement_ids"]),
+            "lines_parsed": counters.get("lines_parsed", 0),
+            "lines_created": counters.get("lines_created", 0),
+            "duplicates_skipped": counters.get("duplicates_skipped", 0),
+            "duration": sum(phase["duration"] for phase in stats["phases"].values()),
+            "query_count": sum(phase["queries"] for phase in stats["phases"].values()),
+            "stats": json.dumps(stats),
+            "notifications": "\n\n".join(result["notifications"]) or False,
+        }
+
     def import_file_button(self):
         """Process the file chosen in the wizard, create bank statement(s)
         and return an action."""
@@ -65,45 +243,200 @@ class AccountStatementImport(models.TransientModel):
             return action_with_notif
         return action
 
+    def _prepare_import_job_vals(self):
+        # Store the values of the other fields of the wizard (the sheet
+        # mapping for example) to re-create the same wizard in the job
+        wizard_values = {}
+        for name, field in self._fields.items():
+            if (
+                field.automatic
+                or not field.store
+                or field.type == "binary"
+                or name in ("statement_filename", "statement_file_ids")
+            ):
+                continue
+            wizard_values[name] = field.convert_to_write(self[name], self)
+        return {
+            "name": self.statement_filename or _("Bank Statement File"),
+            "journal_id": self.env.context.get("journal_id"),
+            "wizard_values": json.dumps(wizard_values, default=str),
+        }
+
+    def import_file_background_button(self):
+        """Store the file chosen in the wizard, import it later
+        in a scheduled action and return the action of the import job.
+        This is meant for big files, which could not be imported within
+        the timeout of an HTTP request."""
+        self.ensure_one()
+        if self.statement_file_ids:
+            wizards = self._get_file_wizards()
+        elif self.statement_file:
+            wizards = self
+        else:
+            raise UserError(_("You must select a bank statement file to import."))
+        jobs = self.env["account.statement.import.job"]
+        # One job per file
+        for wizard in wizards:
+            job = jobs.create(wizard._prepare_import_job_vals())
+            job.attachment_id = self.env["ir.attachment"].create(
+                {
+                    "name": job.name,
+                    "res_model": job._name,
+                    "res_id": job.id,
+                    "datas": wizard.statement_file,
+                }
+            )
+            jobs |= job
+        jobs._trigger_cron()
+        action = {
+            "type": "ir.actions.act_window",
+            "name": _("Bank Statement Import Jobs"),
+            "res_model": jobs._name,
+            "target": "current",
+        }
+        if len(jobs) == 1:
+            action.update({"res_id": jobs.id, "view_mode": "form"})
+        else:
+            action.update(
+                {"domain": [("id", "in", jobs.ids)], "view_mode": "tree,form"}
+            )
+        return action
+
+    @api.model
+    def _get_file_sha256(self, file_data):
+        return hashlib.sha256(file_data).hexdigest()
+
+    def _check_file_already_imported(self, file_data):
+        """Return an error message if the very same file has already been
+        imported, without parsing it. Files that only partially overlap
+        with an imported file are handled by the check on the
+        unique_import_id of the transactions.
+        The context key 'statement_import_skip_file_check' disables
+        this check."""
+        if self.env.context.get("statement_import_skip_file_check"):
+            return False
+        attachment = (
+            self.env["ir.attachment"]
+            .sudo()
+            .search(
+                [
+                    ("statement_file_sha256", "=", self._get_file_sha256(file_data)),
+                    ("res_model", "=", "account.bank.statement"),
+                    ("company_id", "=", self.env.company.id),
+                ],
+                limit=1,
+            )
+        )
+        if not attachment:
+            return False
+        statement = self.env["account.bank.statement"].sudo().browse(attachment.res_id)
+        return _(
+            "This file has already been imported on %(date)s "
+            "(bank statement '%(statement)s').",
+            date=format_date(self.env, attachment.create_date),
+            statement=statement.exists().display_name,
+        )
+
     def _prepare_create_attachment(self, result):
         # Attach to first bank statement
         res_id = result["statement_ids"][0]
         st = self.env["account.bank.statement"].browse(res_id)
+        file_data = base64.b64decode(self.statement_file)
         vals = {
             "name": self.statement_filename,
             "res_id": res_id,
             "company_id": st.company_id.id,
             "res_model": "account.bank.statement",
             "datas": self.statement_file,
+            "statement_file_sha256": self._get_file_sha256(file_data),
         }
+        compressed_data = self._compress_statement_file(file_data)
+        if compressed_data:
+            vals.update(
+                {
+                    "datas": base64.b64encode(compressed_data),
+                    "statement_file_compressed": True,
+                    "mimetype": guess_mimetype(file_data),
+                }
+            )
         return vals
 
+    def _compress_statement_file(self, file_data):
+        """Return the file compressed with gzip if the system parameter
+        'account_statement_import_file.compress_files' is set and if
+        the file is not already compressed, False otherwise.
+        The compression is deterministic, so that identical files are still
+        stored only once in the filestore."""
+        compress = (
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("account_statement_import_file.compress_files")
+        )
+        if not compress or file_data.startswith(COMPRESSED_FILE_MAGICS):
+            return False
+        compressed_data = gzip.compress(file_data, mtime=0)
+        if len(compressed_data) >= len(file_data):
+            return False
+        return compressed_data
+
     def import_single_file(self, file_data, result):
-        parsing_data = self.with_context(active_id=self.ids[0])._parse_file(file_data)
-        if not isinstance(parsing_data, list):  # for backward compatibility
+        # The currency and the journal of the statements are resolved
+        # only once per file (see _get_import_cache)
+        wizard = self.with_context(statement_import_cache={})
+        with wizard._import_phase("parse"):
+            parsing_data = wizard.with_context(
+                active_id=self.ids[0]
+            )._detect_and_parse_file(file_data)
+        if isinstance(parsing_data, tuple):  # for backward compatibility
             parsing_data = [parsing_data]
-        logger.info(
-            "Bank statement file %s contains %d accounts",
-            self.statement_filename,
-            len(parsing_data),
-        )
+        # parsing_data can be a generator (see _parse_file): the accounts
+        # are imported as they are parsed
         i = 0
-        for single_statement_data in parsing_data:
+        for single_statement_data in wizard._iter_import_phase(parsing_data, "parse"):
             i += 1
             logger.debug(
                 "account %d: single_statement_data=%s", i, single_statement_data
             )
-            self.import_single_statement(single_statement_data, result)
+            wizard.import_single_statement(single_statement_data, result)
+        logger.info(
+            "Bank statement file %s contains %d accounts",
+            self.statement_filename,
+            i,
+        )
 
-    def import_single_statement(self, single_statement_data, result):
-        if not isinstance(single_statement_data, tuple):
-            raise UserError(
-                _("The parsing of the statement file returned an invalid result.")
-            )
-        currency_code, account_number, stmts_vals = single_statement_data
-        # Check raw data
-        if not self._check_parsed_data(stmts_vals):
-            return False
+    def _split_stmts_vals(self, stmts_vals):
+        """Return the chunks of statements to import one after the other.
+        A list of statements is imported in one go, as before, whereas the
+        statements yielded by a streaming parser are imported by chunks
+        of STATEMENT_IMPORT_CHUNK_SIZE statements. In a background job,
+        both are imported by chunks of the chunk size of the job, which
+        is committed after each chunk. Both chunks are also bounded to
+        STATEMENT_IMPORT_CHUNK_LINES transactions."""
+        job_id = self.env.context.get("statement_import_job_id")
+        if job_id:
+            job = self.env["account.statement.import.job"].browse(job_id)
+            return self._iter_stmts_vals_chunks(stmts_vals, max(job.chunk_size, 1))
+        if isinstance(stmts_vals, (list, tuple)):
+            return [stmts_vals]
+        return self._iter_stmts_vals_chunks(stmts_vals, STATEMENT_IMPORT_CHUNK_SIZE)
+
+    @api.model
+    def _iter_stmts_vals_chunks(self, stmts_vals, size):
+        """Yield the chunks of at most size statements of stmts_vals. A chunk
+        is also ended after STATEMENT_IMPORT_CHUNK_LINES transactions."""
+        chunk = []
+        nb_lines = 0
+        for st_vals in stmts_vals:
+            chunk.append(st_vals)
+            nb_lines += len(st_vals["transactions"] or [])
+            if len(chunk) >= size or nb_lines >= STATEMENT_IMPORT_CHUNK_LINES:
+                yield chunk
+                chunk = []
+                nb_lines = 0
+        if chunk:
+            yield chunk
+
+    def _get_statement_journal(self, currency_code, account_number):
         if not currency_code:
             raise UserError(_("Missing currency code in the bank statement file."))
         # account_number can be None (example : QIF)
@@ -114,10 +447,48 @@ class AccountStatementImport(models.TransientModel):
                 _("The Bank Accounting Account is not set on the journal '%s'.")
                 % journal.display_name
             )
-        # Prepare statement data to be used for bank statements creation
-        stmts_vals = self._complete_stmts_vals(stmts_vals, journal, account_number)
-        # Create the bank statements
-        self._create_bank_statements(stmts_vals, result)
+        return journal
+
+    def import_single_statement(self, single_statement_data, result):
+        if not isinstance(single_statement_data, tuple):
+            raise UserError(
+                _("The parsing of the statement file returned an invalid result.")
+            )
+        currency_code, account_number, stmts_vals = single_statement_data
+        streaming = not isinstance(stmts_vals, (list, tuple))
+        if streaming:
+            stmts_vals = self._iter_import_phase(stmts_vals, "parse")
+        journal = None
+        for stmts_vals_chunk in self._split_stmts_vals(stmts_vals):
+            self._count_import_stat(
+                "lines_parsed",
+                sum(len(st_vals["transactions"] or []) for st_vals in stmts_vals_chunk),
+            )
+            # Check raw data
+            if not self._check_parsed_data(stmts_vals_chunk):
+                continue
+            with self._import_phase("journal"):
+                if journal is None:
+                    journal = self._get_statement_journal(currency_code, account_number)
+            # Prepare statement data to be used for bank statements creation
+            with self._import_phase("complete"):
+                stmts_vals_chunk = self._complete_stmts_vals(
+                    stmts_vals_chunk, journal, account_number
+                )
+            # Create the bank statements
+            self._create_bank_statements(stmts_vals_chunk, result)
+            # When the file is imported by a background job, report the progress
+            job_id = self.env.context.get("statement_import_job_id")
+            if job_id:
+                self.env["account.statement.import.job"].browse(
+                    job_id
+                )._update_progress(result)
+            if streaming:
+                # Don't keep the created records in the cache, so that the
+                # memory used by the import doesn't grow with the file
+                self.env.invalidate_all()
+        if journal is None:
+            return False
         # Now that the import worked out, set it as the bank_statements_source
         # of the journal
         if journal.bank_statements_source != "file_import_oca":
@@ -126,6 +497,55 @@ class AccountStatementImport(models.TransientModel):
             # must be able to import bank statement files
             journal.sudo().write({"bank_statements_source": "file_import_oca"})
 
+    def _get_statement_file_formats(self):
+        """Each module adding a file support should extend this method
+        to declare its format, so that files are sent directly to the right
+        parser instead of going through the whole _parse_file chain.
+        Return a list of triplets:
+            - format name: string (e.g: 'camt')
+            - detection method: receives the first bytes of the file
+              (STATEMENT_FILE_HEAD_SIZE) and returns True if the file
+              is in this format. It must be cheap, and must not parse
+              the file.
+            - parsing method: receives the whole file and returns the same
+              data as _parse_file, or raises ValueError if the file is not
+              in this format after all.
+        """
+        return []
+
+    def _detect_and_parse_file(self, data_file):
+        """Parse the file with the parser of the first format whose detection
+        method recognizes the file. Fall back on the _parse_file chain when
+        no format is detected."""
+        head = data_file[:STATEMENT_FILE_HEAD_SIZE]
+        for file_format, detect, parse in self._get_statement_file_formats():
+            start = time.perf_counter()
+            detected = detect(head)
+            logger.debug(
+                "Detection of format %s on file %s: %s (%.3f ms)",
+                file_format,
+                self.statement_filename,
+                detected,
+                (time.perf_counter() - start) * 1000,
+            )
+            if detected:
+                try:
+                    parsing_data = parse(data_file)
+                except ValueError:
+                    logger.debug(
+                        "File %s was detected as %s but could not be parsed "
+                        "as such, falling back on the parser chain",
+                        self.statement_filename,
+                        file_format,
+                        exc_info=True,
+                    )
+                    break
+                stats = self.env.context.get("statement_import_stats")
+                if stats is not None:
+                    stats["file_format"] = file_format
+                return parsing_data
+        return self._parse_file(data_file)
+
     def _parse_file(self, data_file):
         """Each module adding a file support must extends this method.
         It processes the file if it can, returns super otherwise,
@@ -154,6 +574,16 @@ class AccountStatementImport(models.TransientModel):
                     -o 'partner_name': string
         If the file is a multi-statement file, this method must return
         a list of triplets.
+        To import big files with a bounded memory usage, this method can
+        also return a generator of triplets, whose bank statements data is
+        itself a generator of bank statements (each one having a list of
+        transactions): the accounts are then imported one after the other,
+        and their bank statements are checked, completed and created by
+        chunks of STATEMENT_IMPORT_CHUNK_SIZE statements, or of
+        STATEMENT_IMPORT_CHUNK_LINES transactions. A big statement can then
+        be yielded by parts, each with a part of its transactions: the
+        parts after the first one have the item 'continued' set to True,
+        and their lines are added to the statement of the first part.
         """
         raise UserError(
             _(
@@ -181,8 +611,81 @@ class AccountStatementImport(models.TransientModel):
             return False
         return True
 
+    @api.model
+    def _new_import_stats(self):
+        """Return the dict collecting the statistics of the import of a file,
+        to be given in the context key 'statement_import_stats':
+        - 'phases': {phase: {'duration': seconds, 'queries': SQL queries}}
+        - 'counters': {name: value}
+        - 'file_format': name of the detected format, if any"""
+        return {"phases": {}, "counters": {}}
+
+    @contextmanager
+    def _import_phase(self, phase):
+        """Add the duration and the number of SQL queries of the enclosed code
+        to the statistics of the given phase of the import, if any"""
+        stats = self.env.context.get("statement_import_stats")
+        if stats is None:
+            yield
+            return
+        start = time.perf_counter()
+        query_count = self.env.cr.sql_log_count
+        try:
+            yield
+        finally:
+            phase_stats = stats["phases"].setdefault(
+                phase, {"duration": 0.0, "queries": 0}
+            )
+            phase_stats["duration"] += time.perf_counter() - start
+            phase_stats["queries"] += self.env.cr.sql_log_count - query_count
+
+    def _iter_import_phase(self, iterable, phase):
+        """Iterate on iterable, counting the time spent to get each item
+        in the given phase. This is used for the generators of the streaming
+        parsers, which parse the file while it is imported."""
+        iterator = iter(iterable)
+        while True:
+            with self._import_phase(phase):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    @api.model
+    def _count_import_stat(self, name, value=1):
+        stats = self.env.context.get("statement_import_stats")
+        if stats is not None:
+            stats["counters"][name] = stats["counters"].get(name, 0) + value
+
+    def _log_import_stats(self, stats):
+        logger.info(
+            "Bank statement file %s imported in %.3f s. Phases: %s. Counters: %s",
+            self.statement_filename,
+            sum(phase["duration"] for phase in stats["phases"].values()),
+            ", ".join(
+                "%s %.3f s (%d queries)" % (name, phase["duration"], phase["queries"])
+                for name, phase in stats["phases"].items()
+            ),
+            ", ".join(
+                "%s=%d" % (name, value) for name, value in stats["counters"].items()
+            ),
+        )
+
+    @api.model
+    def _get_import_cache(self, key):
+        """Return the dict used to cache the results of key during the import
+        of the current file, or None outside of an import"""
+        cache = self.env.context.get("statement_import_cache")
+        if cache is None:
+            return None
+        return cache.setdefault(key, {})
+
     @api.model
     def _match_currency(self, currency_code):
+        cache = self._get_import_cache("currency")
+        if cache is not None and currency_code in cache:
+            return cache[currency_code]
         currency = self.env["res.currency"].search(
             [("name", "=ilike", currency_code)], limit=1
         )
@@ -194,10 +697,19 @@ class AccountStatementImport(models.TransientModel):
                 )
                 % currency_code
             )
+        if cache is not None:
+            cache[currency_code] = currency
         return currency
 
     @api.model
     def _match_journal(self, account_number, currency):
+        cache = self._get_import_cache("journal")
+        cache_key = (
+            account_number and sanitize_account_number(account_number),
+            currency.id,
+        )
+        if cache is not None and cache_key in cache:
+            return cache[cache_key]
         company = self.env.company
         journal_obj = self.env["account.journal"]
         if not account_number:  # exemple : QIF
@@ -214,17 +726,22 @@ class AccountStatementImport(models.TransientModel):
         else:
             sanitized_account_number = sanitize_account_number(account_number)
 
-            journal = journal_obj.search(
-                [
-                    ("type", "=", "bank"),
-                    (
-                        "bank_account_id.sanitized_acc_number",
-                        "ilike",
-                        sanitized_account_number,
-                    ),
-                ],
-                limit=1,
-            )
+            # Exact match first, which can use the index on the account
+            # number, then the historical 'ilike' match
+            for operator in ("=", "ilike"):
+                journal = journal_obj.search(
+                    [
+                        ("type", "=", "bank"),
+                        (
+                            "bank_account_id.sanitized_acc_number",
+                            operator,
+                            sanitized_account_number,
+                        ),
+                    ],
+                    limit=1,
+                )
+                if journal:
+                    break
             ctx_journal_id = self.env.context.get("journal_id")
             if journal and ctx_journal_id and journal.id != ctx_journal_id:
                 ctx_journal = journal_obj.browse(ctx_journal_id)
@@ -284,68 +801,198 @@ class AccountStatementImport(models.TransientModel):
                     journal_currency_name=journal_currency.name,
                 )
             )
+        if cache is not None:
+            cache[cache_key] = journal
         return journal
 
     def _complete_stmts_vals(self, stmts_vals, journal, account_number):
-        speeddict = journal._statement_line_import_speeddict()
+        lines_vals = [
+            lvals for st_vals in stmts_vals for lvals in st_vals["transactions"]
+        ]
+        account_numbers = journal._statement_line_import_account_numbers(lines_vals)
+        speeddict = journal.with_context(
+            statement_line_import_account_numbers=account_numbers,
+            statement_line_import_speeddict_maps=self._get_speeddict_maps(lines_vals),
+        )._statement_line_import_speeddict()
         for st_vals in stmts_vals:
             st_vals["journal_id"] = journal.id
             for lvals in st_vals["transactions"]:
                 lvals["journal_id"] = journal.id
-                journal._statement_line_import_update_unique_import_id(
-                    lvals, account_number
-                )
-                journal._statement_line_import_update_hook(lvals, speeddict)
+            journal._statement_lines_import_update(
+                st_vals["transactions"], account_number, speeddict
+            )
+            journal._statement_lines_import_update_batch_hook(
+                st_vals["transactions"], speeddict
+            )
+            self._complete_stmt_lines_vals(st_vals["transactions"], journal, speeddict)
+            for lvals in st_vals["transactions"]:
                 if not lvals.get("payment_ref"):
                     raise UserError(_("Missing payment_ref on a transaction."))
         return stmts_vals
 
+    def _get_speeddict_maps(self, lines_vals):
+        """Return the optional maps of the speeddict needed by the format of
+        the file, as a dict {map name: names or references of the given
+        lines} (see _statement_line_import_speeddict())"""
+        return {}
+
+    def _complete_stmt_lines_vals(self, lines_vals, journal, speeddict):
+        """Hook for format modules to complete the values of the lines of
+        a statement, using the speeddict"""
+        return lines_vals
+
+    def _get_existing_statement_lines(self, unique_import_ids):
+        """Return a dict {unique_import_id: statement line ID} for the
+        unique_import_ids that have already been imported."""
+        return self.env["account.bank.statement.line"]._get_imported_unique_import_ids(
+            unique_import_ids
+        )
+
+    def _create_bank_statement_records(self, st_vals_list):
+        """Create the bank statements, with their lines in 'line_ids'.
+        All the statements are created with a single create() call, so that
+        the ORM also creates all their lines with a single create() call
+        on account.bank.statement.line."""
+        return self.env["account.bank.statement"].create(st_vals_list)
+
+    def _filter_imported_lines(
+        self, lines_vals, known_import_ids, ignored_import_ids, statement_import_ids
+    ):
+        """Return the lines of lines_vals which have not been imported yet,
+        and the sum of the amounts of the other ones, which are skipped.
+        statement_import_ids are the unique_import_ids of the lines to create
+        of the statement: a transaction can't be twice in a statement."""
+        st_lines_to_create = []
+        skipped_amount = 0.0
+        for lvals in lines_vals:
+            unique_import_id = lvals.get("unique_import_id")
+            if unique_import_id and unique_import_id in statement_import_ids:
+                raise UserError(
+                    _("The transaction '%s' is twice in the same bank statement.")
+                    % unique_import_id
+                )
+            # we can only have 1 anyhow because we have
+            # a unicity SQL constraint
+            if unique_import_id and unique_import_id in known_import_ids:
+                ignored_import_ids.add(unique_import_id)
+                self._count_import_stat("duplicates_skipped")
+                skipped_amount += float(lvals["amount"])
+            else:
+                st_lines_to_create.append(lvals)
+                # The next statements of the same file must see this
+                # transaction as already imported
+                if unique_import_id:
+                    known_import_ids.add(unique_import_id)
+                    statement_import_ids.add(unique_import_id)
+        return st_lines_to_create, skipped_amount
+
+    def _add_statement_part(
+        self, st_vals, st_lines_to_create, skipped_amount, previous, st_vals_list
+    ):
+        """Add the lines to create of a statement, or of a part of a statement
+        (see _parse_file()), to the statements to create, st_vals_list.
+        previous is the state of the statement continued by the next parts.
+        If that statement was created with a previous chunk, return the lines
+        to create in it."""
+        if st_lines_to_create and not st_lines_to_create[0].get("sequence"):
+            for seq, vals in enumerate(
+                st_lines_to_create, start=previous.get("line_count", 0) + 1
+            ):
+                vals["sequence"] = seq
+        previous["line_count"] = previous.get("line_count", 0) + len(st_lines_to_create)
+        if previous.get("vals"):
+            # Part of a statement created with this chunk
+            previous_vals = previous["vals"]
+            previous_vals["line_ids"] += [
+                [0, False, line] for line in st_lines_to_create
+            ]
+            if "balance_start" in previous_vals:
+                previous_vals["balance_start"] += skipped_amount
+            return []
+        if previous.get("statement"):
+            # Part of a statement created with a previous chunk
+            statement = previous["statement"]
+            if skipped_amount and "balance_start" in st_vals:
+                statement.balance_start += skipped_amount
+            for line in st_lines_to_create:
+                line["statement_id"] = statement.id
+            return st_lines_to_create
+        # The amounts of the skipped transactions of the previous parts,
+        # if any, are also added to the starting balance
+        previous["skipped_amount"] = (
+            previous.get("skipped_amount", 0.0) + skipped_amount
+        )
+        if len(st_lines_to_create) > 0:
+            if "balance_start" in st_vals:
+                st_vals["balance_start"] += previous["skipped_amount"]
+            # Remove values that won't be used to create records
+            st_vals.pop("transactions", None)
+            st_vals["line_ids"] = [[0, False, line] for line in st_lines_to_create]
+            st_vals_list.append(st_vals)
+            previous["vals"] = st_vals
+        return []
+
     def _create_bank_statements(self, stmts_vals, result):
         """Create new bank statements from imported values,
         filtering out already imported transactions,
-        and return data used by the reconciliation widget"""
-        abs_obj = self.env["account.bank.statement"]
-        absl_obj = self.env["account.bank.statement.line"]
+        and return data used by the reconciliation widget.
+        The lines of the statements with 'continued' set to True are added
+        to the previous statement (see _parse_file())."""
+        # The statement which the next parts continue: it can be created
+        # by the previous chunk of statements of the file
+        previous = self._get_import_cache("continued_statement")
+        if previous is None:
+            previous = {}
+        st_vals_list = []
+        continued_lines_vals = []
+        ignored_import_ids = set()
+        with self._import_phase("duplicates"):
+            known_import_ids = set(
+                self._get_existing_statement_lines(
+                    {
+                        lvals["unique_import_id"]
+                        for st_vals in stmts_vals
+                        for lvals in st_vals["transactions"]
+                        if lvals.get("unique_import_id")
+                    }
+                )
+            )
+            for st_vals in stmts_vals:
+                if not st_vals.pop("continued", False):
+                    previous.clear()
+                st_lines_to_create, skipped_amount = self._filter_imported_lines(
+                    st_vals["transactions"],
+                    known_import_ids,
+                    ignored_import_ids,
+                    previous.setdefault("unique_import_ids", set()),
+                )
+                continued_lines_vals += self._add_statement_part(
+                    st_vals, st_lines_to_create, skipped_amount, previous, st_vals_list
+                )
 
-        # Filter out already imported transactions and create statements
-        statement_ids = []
-        existing_st_line_ids = {}
-        for st_vals in stmts_vals:
-            st_lines_to_create = []
-            for lvals in st_vals["transactions"]:
-                existing_line = False
-                if lvals.get("unique_import_id"):
-                    existing_line = absl_obj.sudo().search(
-                        [
-                            ("unique_import_id", "=", lvals["unique_import_id"]),
-                        ],
-                        limit=1,
-                    )
-                    # we can only have 1 anyhow because we have a unicity SQL constraint
-                if existing_line:
-                    existing_st_line_ids[existing_line.id] = True
-                    if "balance_start" in st_vals:
-                        st_vals["balance_start"] += float(lvals["amount"])
-                else:
-                    st_lines_to_create.append(lvals)
-
-            if len(st_lines_to_create) > 0:
-                if not st_lines_to_create[0].get("sequence"):
-                    for seq, vals in enumerate(st_lines_to_create, start=1):
-                        vals["sequence"] = seq
-                # Remove values that won't be used to create records
-                st_vals.pop("transactions", None)
-                # Create the statement with lines
-                st_vals["line_ids"] = [[0, False, line] for line in st_lines_to_create]
-                statement = abs_obj.create(st_vals)
-                statement_ids.append(statement.id)
-
-        if not statement_ids:
+        if not st_vals_list and not continued_lines_vals:
             return False
-        result["statement_ids"].extend(statement_ids)
+        # Create the statements with their lines
+        with self._import_phase("create"):
+            statements = self.env["account.bank.statement"]
+            if st_vals_list:
+                statements = self._create_bank_statement_records(st_vals_list)
+            if continued_lines_vals:
+                self.env["account.bank.statement.line"].create(continued_lines_vals)
+        if previous.get("vals"):
+            # The vals of the previous part are the last ones of st_vals_list
+            previous["statement"] = statements[-1]
+            previous["vals"] = None
+        self._count_import_stat("statements_created", len(statements))
+        self._count_import_stat(
+            "lines_created",
+            sum(len(st_vals["line_ids"]) for st_vals in st_vals_list)
+            + len(continued_lines_vals),
+        )
+        result["statement_ids"].extend(statements.ids)
 
         # Prepare import feedback
-        num_ignored = len(existing_st_line_ids)
+        num_ignored = len(ignored_import_ids)
         if num_ignored > 0:
             if num_ignored == 1:
                 msg = _("1 transaction had already been imported and was ignored.")
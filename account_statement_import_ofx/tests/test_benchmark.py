@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+
+from odoo.tests import tagged
+
+from odoo.addons.account_statement_import_file.tests.common import (
+    StatementImportBenchmarkCase,
+)
+
+OFX_HEADER = """<?xml version="1.0" encoding="ASCII"?>
+<?OFX OFXHEADER="200" VERSION="211" SECURITY="NONE" OLDFILEUID="NONE" NEWFILEUID="NONE"?>
+<OFX>
+  <SIGNONMSGSRSV1>
+    <SONRS>
+      <STATUS><CODE>0</CODE><SEVERITY>INFO</SEVERITY></STATUS>
+      <DTSERVER>20240101000000</DTSERVER>
+      <LANGUAGE>ENG</LANGUAGE>
+    </SONRS>
+  </SIGNONMSGSRSV1>
+  <BANKMSGSRSV1>
+    <STMTTRNRS>
+      <TRNUID>0</TRNUID>
+      <STATUS><CODE>0</CODE><SEVERITY>INFO</SEVERITY></STATUS>
+      <STMTRS>
+        <CURDEF>%(currency)s</CURDEF>
+        <BANKACCTFROM>
+          <BANKID>000000123</BANKID>
+          <ACCTID>%(account_number)s</ACCTID>
+          <ACCTTYPE>CHECKING</ACCTTYPE>
+        </BANKACCTFROM>
+        <BANKTRANLIST>
+          <DTSTART>20240101</DTSTART>
+          <DTEND>20241231</DTEND>"""
+OFX_TRANSACTION = """
+          <STMTTRN>
+            <TRNTYPE>POS</TRNTYPE>
+            <DTPOSTED>%(date)s</DTPOSTED>
+            <TRNAMT>%(amount).2f</TRNAMT>
+            <FITID>%(fitid)s</FITID>
+            <NAME>Benchmark Payee %(payee)d</NAME>
+            <MEMO>Invoice %(fitid)s</MEMO>
+          </STMTTRN>"""
+OFX_FOOTER = """
+        </BANKTRANLIST>
+        <LEDGERBAL>
+          <BALAMT>%(balance).2f</BALAMT>
+          <DTASOF>20241231</DTASOF>
+        </LEDGERBAL>
+      </STMTRS>
+    </STMTTRNRS>
+  </BANKMSGSRSV1>
+</OFX>
+"""
+
+
+def generate_ofx_file(nb_lines, account_number, currency_code):
+    """Return a synthetic OFX file of nb_lines transactions"""
+    parts = [OFX_HEADER % {"currency": currency_code, "account_number": account_number}]
+    parts.extend(
+        OFX_TRANSACTION
+        % {
+            "date": (date(2024, 1, 1) + timedelta(days=index % 365)).strftime("%Y%m%d"),
+            "amount": -10.0 - index % 100,
+            "fitid": "BENCH-%d-%d" % (nb_lines, index),
+            "payee": index % 500,
+        }
+        for index in range(nb_lines)
+    )
+    parts.append(
+        OFX_FOOTER % {"balance": -sum(10.0 + index % 100 for index in range(nb_lines))}
+    )
+    return "".join(parts).encode("ascii")
+
+
+@tagged("-standard", "statement_import_benchmark")
+class TestOfxBenchmark(StatementImportBenchmarkCase):
+    """Run with --test-tags statement_import_benchmark"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.account_number = "987654321"
+        cls.journal = cls._create_benchmark_journal(
+            "BNCOFX", account_number=cls.account_number
+        )
+
+    def test_benchmark_ofx(self):
+        currency_code = self.env.company.currency_id.name
+        self._check_import_benchmark(
+            "OFX",
+            lambda nb_lines: generate_ofx_file(
+                nb_lines, self.account_number, currency_code
+            ),
+            "benchmark.ofx",
+        )
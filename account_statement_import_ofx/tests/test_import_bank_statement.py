@@ -70,6 +70,14 @@ class TestOfxFile(TransactionCase):
         )
         self.assertFalse(bank_statement._check_ofx(data_file=ofx_file_wrong))
 
+    def test_detect_ofx(self):
+        ofx_file_path = get_module_resource(
+            "account_statement_import_ofx", "tests/test_ofx_file/", "test_ofx.ofx"
+        )
+        with open(ofx_file_path, "rb") as ofx_file:
+            self.assertTrue(self.asi_model._detect_ofx(ofx_file.read(4096)))
+        self.assertFalse(self.asi_model._detect_ofx(b"!Type:Bank\nD01/01/2020"))
+
     def test_ofx_file_import(self):
         ofx_file_path = get_module_resource(
             "account_statement_import_ofx", "tests/test_ofx_file/", "test_ofx.ofx"
@@ -48,11 +48,31 @@ class AccountStatementImport(models.TransientModel):
         }
         return vals
 
+    def _get_statement_file_formats(self):
+        return super()._get_statement_file_formats() + [
+            ("ofx", self._detect_ofx, self._parse_ofx_file)
+        ]
+
+    @api.model
+    def _detect_ofx(self, head):
+        # OFX 1.x starts with a SGML header, OFX 2.x is an XML file
+        # with an OFX processing instruction
+        head = head.upper()
+        return bool(OfxParser) and (b"OFXHEADER" in head or b"<OFX>" in head)
+
+    def _parse_ofx_file(self, data_file):
+        ofx = self._check_ofx(data_file)
+        if not ofx:
+            raise ValueError("Not a valid OFX file.")
+        return self._parse_ofx(ofx)
+
     def _parse_file(self, data_file):
         ofx = self._check_ofx(data_file)
         if not ofx:
             return super()._parse_file(data_file)
+        return self._parse_ofx(ofx)
 
+    def _parse_ofx(self, ofx):
         result = []
         try:
             for account in ofx.accounts:
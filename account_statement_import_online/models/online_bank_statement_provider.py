@@ -13,6 +13,7 @@ from dateutil.relativedelta import MO, relativedelta
 from pytz import timezone, utc
 
 from odoo import _, api, fields, models
+from odoo.exceptions import UserError
 
 from odoo.addons.base.models.res_partner import _tz_get
 
@@ -330,7 +331,13 @@ class OnlineBankStatementProvider(models.Model):
         AccountBankStatementLine = self.env["account.bank.statement.line"]
         provider_tz = timezone(self.tz) if self.tz else utc
         journal = self.journal_id
-        speeddict = journal._statement_line_import_speeddict()
+        account_numbers = journal._statement_line_import_account_numbers(
+            unfiltered_lines
+        )
+        speeddict = journal.with_context(
+            statement_line_import_account_numbers=account_numbers
+        )._statement_line_import_speeddict()
+        dated_lines = []
         filtered_lines = []
         lines_before_since = 0
         lines_after_until = 0
@@ -362,11 +369,29 @@ class OnlineBankStatementProvider(models.Model):
             journal._statement_line_import_update_unique_import_id(
                 line_values, self.account_number
             )
+            dated_lines.append(line_values)
+        # Look up the already imported lines with a few queries
+        # instead of one query per line
+        known_import_ids = set(
+            AccountBankStatementLine._get_imported_unique_import_ids(
+                {
+                    line_values["unique_import_id"]
+                    for line_values in dated_lines
+                    if line_values.get("unique_import_id")
+                }
+            )
+        )
+        pulled_import_ids = set()
+        for line_values in dated_lines:
             unique_import_id = line_values.get("unique_import_id")
             if unique_import_id:
-                if AccountBankStatementLine.sudo().search(
-                    [("unique_import_id", "=", unique_import_id)], limit=1
-                ):
+                if unique_import_id in pulled_import_ids:
+                    raise UserError(
+                        _("The transaction '%s' is twice in the same bank statement.")
+                        % unique_import_id
+                    )
+                pulled_import_ids.add(unique_import_id)
+                if unique_import_id in known_import_ids:
                     lines_not_unique += 1
                     continue
             if not line_values.get("payment_ref"):
@@ -374,6 +399,7 @@ class OnlineBankStatementProvider(models.Model):
             line_values["journal_id"] = self.journal_id.id
             journal._statement_line_import_update_hook(line_values, speeddict)
             filtered_lines.append(line_values)
+        journal._statement_lines_import_update_batch_hook(filtered_lines, speeddict)
         if unfiltered_lines:
             if len(unfiltered_lines) == len(filtered_lines):
                 _logger.debug(_("All lines passed filtering"))
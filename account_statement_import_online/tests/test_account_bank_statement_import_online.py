@@ -11,6 +11,7 @@ from dateutil.relativedelta import relativedelta
 from odoo_test_helper import FakeModelLoader
 
 from odoo import _, fields
+from odoo.exceptions import UserError
 from odoo.tests import common
 
 _logger = logging.getLogger(__name__)
@@ -127,6 +128,32 @@ class TestAccountBankAccountStatementImportOnline(common.TransactionCase):
         )
         self._getExpectedLines(expected_count)
 
+    def test_pull_batch_hook(self):
+        self.provider.statement_creation_mode = "daily"
+        with mock.patch.object(
+            type(self.journal), "_statement_lines_import_update_batch_hook"
+        ) as mock_batch_hook:
+            self.provider.with_context(step={"hours": 8})._pull(
+                self.now - relativedelta(days=1),
+                self.now,
+            )
+        self.assertTrue(mock_batch_hook.called)
+        # The hook receives the lines of a statement at once
+        lines_vals = [
+            line_vals
+            for call in mock_batch_hook.call_args_list
+            for line_vals in call.args[0]
+        ]
+        self.assertEqual(
+            len(lines_vals),
+            self.AccountBankStatementLine.search_count(
+                [("journal_id", "=", self.journal.id)]
+            ),
+        )
+        self.assertTrue(
+            all(line_vals["journal_id"] == self.journal.id for line_vals in lines_vals)
+        )
+
     def test_interval_type_minutes(self):
         self.provider.interval_type = "minutes"
         self.provider._compute_update_schedule()
@@ -385,6 +412,23 @@ class TestAccountBankAccountStatementImportOnline(common.TransactionCase):
         self.assertEqual(statements[1].balance_end, 200)
         self.assertEqual(len(statements[1].line_ids), 1)
 
+    def test_pull_duplicate_lines(self):
+        """A transaction twice in the same pull is an error, while a
+        transaction already imported is skipped."""
+        self.provider.statement_creation_mode = "daily"
+        for _i in range(2):
+            with mock.patch(mock_obtain_statement_data) as mock_data:
+                mock_data.return_value = self._get_statement_line_data(
+                    date(2021, 8, 10)
+                )
+                self.provider._pull(datetime(2021, 8, 10), datetime(2021, 8, 11))
+            self._getExpectedLines(1)
+        lines, statement_values = self._get_statement_line_data(date(2021, 8, 12))
+        with mock.patch(mock_obtain_statement_data) as mock_data:
+            mock_data.return_value = (lines + [dict(lines[0])], statement_values)
+            with self.assertRaisesRegex(UserError, "twice in the same bank statement"):
+                self.provider._pull(datetime(2021, 8, 12), datetime(2021, 8, 13))
+
     def test_unlink_provider(self):
         """Unlink provider should clear fields on journal."""
         self.provider.unlink()
@@ -0,0 +1,46 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+from datetime import date, timedelta
+
+from odoo.tests import tagged
+
+from odoo.addons.account_statement_import_file.tests.common import (
+    StatementImportBenchmarkCase,
+)
+
+
+def generate_qif_file(nb_lines):
+    """Return a synthetic QIF file of nb_lines transactions, whose payees
+    are partly existing partners"""
+    parts = ["!Type:Bank"]
+    for index in range(nb_lines):
+        parts.append(
+            "D%s\nT%.2f\nNBENCH-%d-%d\nPBenchmark Payee %d\n^"
+            % (
+                (date(2024, 1, 1) + timedelta(days=index % 365)).strftime("%m/%d/%y"),
+                -10.0 - index % 100,
+                nb_lines,
+                index,
+                index % 500,
+            )
+        )
+    return "\n".join(parts).encode("utf-8")
+
+
+@tagged("-standard", "statement_import_benchmark")
+class TestQifBenchmark(StatementImportBenchmarkCase):
+    """Run with --test-tags statement_import_benchmark"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.journal = cls._create_benchmark_journal(
+            "BNCQIF", currency=cls.env.company.currency_id
+        )
+        cls.env["res.partner"].create(
+            [{"name": "Benchmark Payee %d" % index} for index in range(0, 500, 2)]
+        )
+
+    def test_benchmark_qif(self):
+        self._check_import_benchmark(
+            "QIF", generate_qif_file, "benchmark.qif", journal=self.journal
+        )
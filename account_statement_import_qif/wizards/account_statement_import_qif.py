@@ -20,9 +20,17 @@ class AccountStatementImport(models.TransientModel):
     def _check_qif(self, data_file):
         return data_file.strip().startswith(b"!Type:")
 
+    def _get_statement_file_formats(self):
+        return super()._get_statement_file_formats() + [
+            ("qif", self._check_qif, self._parse_qif_file)
+        ]
+
     def _parse_file(self, data_file):
         if not self._check_qif(data_file):
             return super()._parse_file(data_file)
+        return self._parse_qif_file(data_file)
+
+    def _parse_qif_file(self, data_file):
         try:
             file_data = data_file.decode()
             if "\r" in file_data:
@@ -83,23 +91,54 @@ class AccountStatementImport(models.TransientModel):
         journal = self.env["account.journal"].browse(self.env.context.get("journal_id"))
         return journal.currency_id.name, None, [vals_bank_statement]
 
-    def _complete_stmts_vals(self, stmt_vals, journal_id, account_number):
+    def _is_qif_statement_file(self):
+        return bool(self.statement_file) and self._check_qif(
+            base64.b64decode(self.statement_file)
+        )
+
+    def _get_speeddict_maps(self, lines_vals):
+        maps = super()._get_speeddict_maps(lines_vals)
+        if self._is_qif_statement_file():
+            maps["partner_name"] = {
+                line_vals["payment_ref"]
+                for line_vals in lines_vals
+                if line_vals.get("payment_ref") and not line_vals.get("partner_id")
+            }
+        return maps
+
+    def _complete_stmt_lines_vals(self, lines_vals, journal, speeddict):
         """Match partner_id if hasn't been deducted yet."""
-        res = super()._complete_stmts_vals(stmt_vals, journal_id, account_number)
+        lines_vals = super()._complete_stmt_lines_vals(lines_vals, journal, speeddict)
         # Since QIF doesn't provide account numbers (normal behaviour is to
         # provide 'account_number', which the generic module uses to find
         # the partner), we have to find res.partner through the name
-        if not self.statement_file or not self._check_qif(
-            base64.b64decode(self.statement_file)
-        ):
-            return res
+        if "partner_name" not in speeddict or not self._is_qif_statement_file():
+            return lines_vals
+        # Exact match on the name first, then the slower 'ilike'
+        partner_ids = {}
+        for line_vals in lines_vals:
+            if not line_vals.get("partner_id") and line_vals.get("payment_ref"):
+                payment_ref = line_vals["payment_ref"]
+                partner_ids[payment_ref] = speeddict["partner_name"].get(
+                    journal._statement_line_import_normalize_partner_name(payment_ref)
+                )
+        partner_ids.update(
+            self._search_qif_payees(
+                [payee for payee, partner_id in partner_ids.items() if not partner_id]
+            )
+        )
+        for line_vals in lines_vals:
+            if not line_vals.get("partner_id") and line_vals.get("payment_ref"):
+                line_vals["partner_id"] = partner_ids[line_vals["payment_ref"]]
+        return lines_vals
+
+    def _search_qif_payees(self, payees):
+        """Return a dict {payee: ID of the first partner whose name contains
+        the payee, or False}. Each payee is searched with a query limited to
+        a single partner, so that a short payee doesn't load most of the
+        partners."""
         partner_obj = self.env["res.partner"]
-        for statement in res:
-            for line_vals in statement["transactions"]:
-                if not line_vals.get("partner_id") and line_vals.get("payment_ref"):
-                    partner = partner_obj.search(
-                        [("name", "ilike", line_vals["payment_ref"])],
-                        limit=1,
-                    )
-                    line_vals["partner_id"] = partner.id
-        return res
+        return {
+            payee: partner_obj.search([("name", "ilike", payee)], limit=1).id
+            for payee in payees
+        }
@@ -25,25 +25,40 @@ class AccountStatementImport(models.TransientModel):
         default=_get_default_mapping_id,
     )
 
+    def _get_statement_file_formats(self):
+        formats = super()._get_statement_file_formats()
+        # When a mapping is selected, the file must be parsed with it
+        # whatever it looks like
+        if self.sheet_mapping_id:
+            formats.insert(0, ("sheet", lambda head: True, self._parse_sheet_file))
+        return formats
+
+    def _parse_sheet_file(self, data_file):
+        self.ensure_one()
+        try:
+            Parser = self.env["account.statement.import.sheet.parser"]
+            return Parser.parse(
+                data_file, self.sheet_mapping_id, self.statement_filename
+            )
+        except BaseException as exc:
+            if self.env.context.get("account_statement_import_sheet_file_test"):
+                raise
+            _logger.warning("Sheet parser error", exc_info=True)
+            raise UserError(_("Bad file/mapping: ") + str(exc)) from exc
+
     def _parse_file(self, data_file):
         self.ensure_one()
         if self.sheet_mapping_id:
-            try:
-                Parser = self.env["account.statement.import.sheet.parser"]
-                return Parser.parse(
-                    data_file, self.sheet_mapping_id, self.statement_filename
-                )
-            except BaseException as exc:
-                if self.env.context.get("account_statement_import_sheet_file_test"):
-                    raise
-                _logger.warning("Sheet parser error", exc_info=True)
-                raise UserError(_("Bad file/mapping: ") + str(exc)) from exc
+            return self._parse_sheet_file(data_file)
         return super()._parse_file(data_file)
 
     def _create_bank_statements(self, stmts_vals, result):
         """Set balance_end_real if not already provided by the file."""
+        nb_statements = len(result["statement_ids"])
         res = super()._create_bank_statements(stmts_vals, result)
-        statements = self.env["account.bank.statement"].browse(result["statement_ids"])
+        statements = self.env["account.bank.statement"].browse(
+            result["statement_ids"][nb_statements:]
+        )
         for statement in statements:
             if not statement.balance_end_real:
                 amount = sum(statement.line_ids.mapped("amount"))
@@ -0,0 +1,96 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import csv
+from datetime import date, timedelta
+from io import BytesIO, StringIO
+
+import xlsxwriter
+
+from odoo.tests import tagged
+
+from odoo.addons.account_statement_import_file.tests.common import (
+    StatementImportBenchmarkCase,
+)
+
+# Columns of the sample statement mapping
+SHEET_HEADER = [
+    "Date",
+    "Label",
+    "Currency",
+    "Amount",
+    "Amount Currency",
+    "Partner Name",
+    "Bank Account",
+]
+
+
+def _get_sheet_rows(nb_lines, currency_code):
+    for index in range(nb_lines):
+        yield [
+            (date(2024, 1, 1) + timedelta(days=index % 365)).strftime("%m/%d/%Y"),
+            "Benchmark payment %d-%d" % (nb_lines, index),
+            currency_code,
+            "%.2f" % (-10.0 - index % 100),
+            "0.0",
+            "Benchmark Partner %d" % (index % 500),
+            "NL%016d" % (index % 500),
+        ]
+
+
+def generate_csv_file(nb_lines, currency_code):
+    """Return a synthetic CSV file of nb_lines transactions, for the
+    sample statement mapping"""
+    output = StringIO()
+    writer = csv.writer(output, quoting=csv.QUOTE_ALL)
+    writer.writerow(SHEET_HEADER)
+    writer.writerows(_get_sheet_rows(nb_lines, currency_code))
+    return output.getvalue().encode("utf-8")
+
+
+def generate_xlsx_file(nb_lines, currency_code):
+    """Return a synthetic XLSX file of nb_lines transactions, for the
+    sample statement mapping"""
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+    sheet = workbook.add_worksheet()
+    sheet.write_row(0, 0, SHEET_HEADER)
+    for row, values in enumerate(_get_sheet_rows(nb_lines, currency_code), 1):
+        sheet.write_row(row, 0, values)
+    workbook.close()
+    return output.getvalue()
+
+
+@tagged("-standard", "statement_import_benchmark")
+class TestSheetFileBenchmark(StatementImportBenchmarkCase):
+    """Run with --test-tags statement_import_benchmark"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.journal = cls._create_benchmark_journal(
+            "BNCSHT", currency=cls.env.company.currency_id
+        )
+        cls.currency_code = cls.env.company.currency_id.name
+        cls.wizard_vals = {
+            "sheet_mapping_id": cls.env.ref(
+                "account_statement_import_sheet_file.sample_statement_map"
+            ).id
+        }
+
+    def test_benchmark_csv(self):
+        self._check_import_benchmark(
+            "CSV",
+            lambda nb_lines: generate_csv_file(nb_lines, self.currency_code),
+            "benchmark.csv",
+            journal=self.journal,
+            wizard_vals=self.wizard_vals,
+        )
+
+    def test_benchmark_xlsx(self):
+        self._check_import_benchmark(
+            "XLSX",
+            lambda nb_lines: generate_xlsx_file(nb_lines, self.currency_code),
+            "benchmark.xlsx",
+            journal=self.journal,
+            wizard_vals=self.wizard_vals,
+        )